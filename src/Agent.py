@@ -1,52 +1,101 @@
 # Python libraries
-from collections import deque
-
+import numpy as np
 import warnings
 warnings.filterwarnings("ignore")
 
 import os
 
-import tensorflow as tf
-from tensorflow.python import keras
-from keras.models import Sequential
-from keras.layers import Dense
-from keras.optimizers import Adam
-from keras.models import load_model
-from keras import backend as K
-import keras.losses
+# Tensorflow and keras are only imported once a model is built, see importBackend,
+# so tools that just need the game data or the command line don't pay for loading them
 
 # User defined libraries
-from LossHistory import LossHistory
+from CheckpointWriter import CheckpointWriter
 from Message import Message
+from ReplayMemory import ReplayMemory
+
+def importBackend():
+    """Imports the keras pieces used to build the agent models on first use
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    tf
+        The tensorflow module
+
+    Sequential
+        The keras Sequential model class
+
+    Dense
+        The keras Dense layer class
+
+    Adam
+        The keras Adam optimizer class
+    """
+    import tensorflow as tf
+    from keras.models import Sequential
+    from keras.layers import Dense
+    from keras.optimizers import Adam
+    return tf, Sequential, Dense, Adam
 
 class Agent():
     """Abstract class to take care of all the interfacing with the game engine and model saving/loading, inherited by both players"""
 
     ### Static Class Variables
-    MAX_DATA_LENGTH = 1000                                    # Max number of decision frames the Agent can remember from a fight, average is about 2000 per fight
+    MAX_DATA_LENGTH = 1000                                    # Default number of decision frames the Agent can remember, the oldest are overwritten once full
+    TRAINING_SAMPLES = 1000                                   # Number of remembered decision frames replayed each time the agent trains
 
     DEFAULT_MODELS_DIR_PATH = '../local_models'               # Default path to the dir where the trained models are saved for later access
     DEFAULT_MODELS_SUB_DIR = '{0}_models'                     # Models are further organized into subdirectories to avoid checkpoint overwrites by this naming scheme
     DEFAULT_LOGS_DIR_PATH = '../local_logs'                   # Default path to the dir where training logs are saved for user review
+    DEFAULT_CHECKPOINTS_KEPT = 5                              # Number of newest versioned checkpoints kept on disk per model
 
 
     EPSILON_MIN = 0.1                                         # Minimum exploration rate for a trained model
     DEFAULT_EPSILON_DECAY = 0.999                             # How fast the exploration rate falls as training persists
     DEFAULT_DISCOUNT_RATE = 0.98                              # How much future rewards influence the current decision of the model
     DEFAULT_LEARNING_RATE = 0.0001
+    DEFAULT_BATCH_SIZE = 32                                   # Number of memories fed through the model per gradient step while training
+    DEFAULT_TRAINING_EPOCHS = 1                               # Number of passes made over the game memory each time the agent trains
 
     ### Instance Functions
-    def __init__(self, epsilon= 1):
-        """Constructor"""
+    def __init__(self, epsilon= 1, batchSize= DEFAULT_BATCH_SIZE, trainingEpochs= DEFAULT_TRAINING_EPOCHS, replayCapacity= MAX_DATA_LENGTH, replayPath= None, prioritized= False):
+        """Constructor
+        Parameters
+        ----------
+        replayCapacity
+            Integer number of decision frames kept in the replay memory across games
+
+        replayPath
+            String path to a directory the replay memory is memory mapped in, under a sub directory named after the agent.
+            The memory is kept in RAM if None
+
+        prioritized
+            Boolean, if set training replays the decision frames the model was furthest off on more often
+
+        Returns
+        -------
+        None
+        """
+        from LossHistory import LossHistory
         self.name =  self.__class__.__name__
         self.epsilon = epsilon
+        self.batchSize = batchSize
+        self.trainingEpochs = trainingEpochs
         self.lossHistory = LossHistory()
+        self.modelVersion = 0                                 # Bumped whenever the weights change so cached decisions of older weights are dropped
+        self.checkpointsKept = Agent.DEFAULT_CHECKPOINTS_KEPT
+        self.checkpointWriter = None
+        self.memory = None
         self.prepareForNextGame()
         if self.name != "Agent":
+            memoryPath = os.path.join(replayPath, self.name) if replayPath is not None else None
+            self.memory = ReplayMemory(*self.getMemoryShape(), capacity= replayCapacity, path= memoryPath, prioritized= prioritized)
             self.initializeModel()
 
     def prepareForNextGame(self):
-        """Wipes the game memory so it can be filled by the next game
+        """Resets the score for the next game, the replay memory is kept across games
         Parameters
         ----------
         None
@@ -56,7 +105,10 @@ class Agent():
         None
         """
         self.score = 0
-        self.memory = deque(maxlen= Agent.MAX_DATA_LENGTH)
+
+    def getMemoryShape(self):
+        """Returns the observation and mask sizes of one replay memory frame, the model input and output sizes by default"""
+        return self.INPUT_SIZE, self.OUTPUT_SIZE
 
     def getModelName(self):
         """Returns the formatted model name for the current model"""
@@ -66,8 +118,16 @@ class Agent():
         """Returns the formatted log name for the current model"""
         return self.name + "Logs"
 
+    def getCheckpointWriter(self):
+        """Returns the background writer of this agent's checkpoints and logs, starting it on first use"""
+        if self.checkpointWriter is None:
+            totalDirPath = os.path.join(Agent.DEFAULT_MODELS_DIR_PATH, Agent.DEFAULT_MODELS_SUB_DIR.format(self.name))
+            self.checkpointWriter = CheckpointWriter(totalDirPath, self.getModelName(), self.checkpointsKept)
+        return self.checkpointWriter
+
     def saveModel(self):
-        """Saves the currently trained model in the default naming convention ../models/{Class_Name}Model
+        """Snapshots the model weights and queues them as the next versioned checkpoint ../models/{Class_Name}_models/{Class_Name}Model_v{version}.npz
+           The checkpoint, the replay memory flush and the loss log line are written by a background thread, so this returns without waiting on the disk
         Parameters
         ----------
         None
@@ -76,17 +136,19 @@ class Agent():
         -------
         None
         """
-        totalDirPath = os.path.join(Agent.DEFAULT_MODELS_DIR_PATH, Agent.DEFAULT_MODELS_SUB_DIR.format(self.name))
-        self.model.save_weights(os.path.join(totalDirPath, self.getModelName()))
-        with open(os.path.join(Agent.DEFAULT_LOGS_DIR_PATH, self.getLogsName()), 'a+') as file:
-            try:
-                file.write(str(sum(self.lossHistory.losses) / len(self.lossHistory.losses)))
-                file.write('\n')
-            except:
-                pass # No losses to report yet
+        self.getCheckpointWriter().saveWeights(self.model.get_weights())
+        if self.memory is not None: self.getCheckpointWriter().flushMemory(self.memory)
+        self.logLoss()
+
+    def logLoss(self):
+        """Queues the mean loss of the last training run to be appended to the training log ../local_logs/{Class_Name}Logs"""
+        if len(self.lossHistory.losses) == 0: return # No losses to report yet
+        meanLoss = sum(self.lossHistory.losses) / len(self.lossHistory.losses)
+        self.getCheckpointWriter().appendLine(os.path.join(Agent.DEFAULT_LOGS_DIR_PATH, self.getLogsName()), str(meanLoss))
 
     def loadModel(self):
-        """Loads in pretrained model object ../models/{Class_Name}Model
+        """Loads in the newest checkpoint ../models/{Class_Name}_models/{Class_Name}Model_v{version}.npz,
+           falling back on a model saved by keras under ../models/{Class_Name}_models/{Class_Name}Model
         Parameters
         ----------
         None
@@ -95,8 +157,89 @@ class Agent():
         None
         """
         print('Model successfully loaded')
-        totalDirPath = os.path.join(Agent.DEFAULT_MODELS_DIR_PATH, Agent.DEFAULT_MODELS_SUB_DIR.format(self.name))
-        self.model.load_weights(os.path.join(totalDirPath, self.getModelName()))
+        checkpointWriter = self.getCheckpointWriter()
+        checkpointWriter.wait()                               # Checkpoints still being written count as saved
+        checkpointPath = checkpointWriter.latestCheckpoint()
+        if checkpointPath is not None:
+            self.model.set_weights(CheckpointWriter.loadWeights(checkpointPath))
+        else:
+            self.model.load_weights(os.path.join(checkpointWriter.directory, self.getModelName()))
+        self.modelVersion += 1
+
+    def setWeights(self, weights):
+        """Replaces the model weights, such as with weights trained in another process
+        Parameters
+        ----------
+        weights
+            List of numpy arrays as returned by model.get_weights
+
+        Returns
+        -------
+        None
+        """
+        self.model.set_weights(weights)
+        self.modelVersion += 1
+
+    def sampleMemory(self):
+        """Draws the decision frames replayed in one training run, uniformly or by priority depending on the memory
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        indices
+            Integer array of the memory slots drawn, None when sampling uniformly
+
+        observations, actions, rewards, masks
+            Arrays with one decision frame per row
+
+        weights
+            Importance sampling weight of each frame for the fit, None when sampling uniformly
+        """
+        if self.memory.priorities is None:
+            return (None,) + self.memory.sample(Agent.TRAINING_SAMPLES) + (None,)
+        return self.memory.samplePrioritized(Agent.TRAINING_SAMPLES)
+
+    def updatePriorities(self, indices, modelOutputs, actions, rewards):
+        """Sets the priority of prioritized frames from the error between the model prediction and the reward of the action taken
+        Parameters
+        ----------
+        indices
+            Integer array returned by sampleMemory, nothing is done if None
+
+        modelOutputs
+            2D numpy array of the model predictions for each frame, before the targets were written in
+
+        actions, rewards
+            Arrays of the action taken and reward earned in each frame
+
+        Returns
+        -------
+        None
+        """
+        if indices is None: return
+        self.memory.updatePriorities(indices, rewards - modelOutputs[np.arange(len(actions)), actions])
+
+    def fitBatch(self, inputs, targets, sampleWeights= None):
+        """Fits the model to a full matrix of training targets in minibatches, logging each batch loss
+        Parameters
+        ----------
+        inputs
+            2D numpy array with one model input per row
+
+        targets
+            2D numpy array with the desired model output for each row of inputs
+
+        sampleWeights
+            numpy array of the loss weight of each row, such as importance sampling weights, all rows count equally if None
+
+        Returns
+        -------
+        None
+        """
+        self.model.fit(inputs, targets, sample_weight= sampleWeights, batch_size= self.batchSize, epochs= self.trainingEpochs, shuffle= True, verbose= 0, callbacks= [self.lossHistory])
+        self.modelVersion += 1
 
     ### Abstract methods for the child Agent to implement
     def initializeModel(self):
@@ -112,7 +255,7 @@ class Agent():
         raise NotImplementedError("Implement this is in the inherited agent")
     
     def train(self):
-        """Reviews the game memory and runs through one epoch of training for the model
+        """Replays a sample of the memory and runs through one epoch of training for the model
         Parameters
         ----------
         None
@@ -150,10 +293,9 @@ if __name__ == "__main__":
     print(agent.name)
     print(agent.score)
     print(agent.lossHistory)
-    agent.memory.append(2)
-    print(agent.memory)
     print(agent.getLogsName())
     print(agent.getModelName())
+    tf, Sequential, Dense, Adam = importBackend()
     model = Sequential()
     model.add(Dense(48, input_dim= 24, activation='relu'))
     model.add(Dense(96, activation='relu'))
@@ -1,17 +1,18 @@
 # Pyhton Libraries
 import random
 import numpy as np
-import pandas as pd
 #import networkx # only uncommnet for testing
+#from InfectionFrontier import InfectionFrontier # only uncommnet for testing
 
 # User defined libraries
 from Agent import *
 from Message import Message
+from TrafficDataset import TrafficDataset
 
 class Attacker(Agent):
     """Agent that will generate malicious traffic for the network and try not to be caught"""
 
-    def __init__(self, datasetPath, networkSize, epsilon= 1):
+    def __init__(self, datasetPath, networkSize, epsilon= 1, batchSize= Agent.DEFAULT_BATCH_SIZE, trainingEpochs= Agent.DEFAULT_TRAINING_EPOCHS, replayCapacity= Agent.MAX_DATA_LENGTH, replayPath= None, prioritized= False):
         """Constructor for Attacker agent
         Parameters
         ----------
@@ -24,6 +25,21 @@ class Attacker(Agent):
         epsilon
             Float value representing the starting chance the agent makes random moves while training
 
+        batchSize
+            Integer number of memories per gradient step while training
+
+        trainingEpochs
+            Integer number of passes made over the game memory each time the agent trains
+
+        replayCapacity
+            Integer number of decision frames kept in the replay memory across games
+
+        replayPath
+            String path to a directory the replay memory is memory mapped in, kept in RAM if None
+
+        prioritized
+            Boolean, if set training replays decisions by priority instead of uniformly
+
         Returns
         -------
         None      
@@ -35,7 +51,7 @@ class Attacker(Agent):
         self.TRAFFIC_FLOW_INDEX = 0
         self.REACHABLE_NODES_INDEX = int(self.INPUT_SIZE / 3)
         self.INFECTION_SCORES_INDEX = int((self.INPUT_SIZE / 3) * 2)
-        super(Attacker, self).__init__(epsilon= epsilon) # Calling parent constructor
+        super(Attacker, self).__init__(epsilon= epsilon, batchSize= batchSize, trainingEpochs= trainingEpochs, replayCapacity= replayCapacity, replayPath= replayPath, prioritized= prioritized) # Calling parent constructor
 
     def loadDataset(self, datasetPath):
         """loads in the dataset for generating background traffic
@@ -48,7 +64,7 @@ class Attacker(Agent):
         -------
         None
         """
-        self.dataset = pd.read_csv(datasetPath)
+        self.dataset = TrafficDataset.load(datasetPath)
 
     def initializeModel(self):
         """Initializes the model of the agent
@@ -60,6 +76,7 @@ class Attacker(Agent):
         -------
         None
         """
+        tf, Sequential, Dense, Adam = importBackend()
         model = Sequential()
         model.add(Dense(self.INPUT_SIZE, input_dim= self.INPUT_SIZE, activation='relu'))
         model.add(Dense(self.OUTPUT_SIZE * 2, activation='relu'))
@@ -67,8 +84,8 @@ class Attacker(Agent):
         model.compile(loss= tf.keras.losses.Huber(), optimizer=Adam(lr=Agent.DEFAULT_LEARNING_RATE))
         self.model = model
 
-    def getAttack(self, trafficFlow, reachableNodes, infectionScores, infectedNodes, graph):
-        """Initializes the model of the agent
+    def getAttack(self, trafficFlow, reachableNodes, infectionScores, frontier):
+        """Picks the node to attack this round and builds the attack message for it
         Parameters
         ----------
         trafficFlow
@@ -80,11 +97,8 @@ class Attacker(Agent):
         infectionScores
             Reward score for infecting each node in the network
         
-        infectedNodes
-            List of the IPs of the infected nodes in the graph
-
-        graph
-            networkx graph of the current state of the network
+        frontier
+            InfectionFrontier tracking which infected nodes can attack each reachable node
 
         Returns
         -------
@@ -94,33 +108,42 @@ class Attacker(Agent):
         index
             Index of the node being attacked in the graphs node list, is one greater than the lenght for a "by"
         """
-        if random.random() < self.epsilon: 
-            reachableNodeIndicies = [index for index, canReach  in enumerate(reachableNodes) if canReach] 
-            reachableNodeIndicies += [self.OUTPUT_SIZE - 1]
-            destinationIndex = random.choice(reachableNodeIndicies)
-        else:
-            attackerInputs = trafficFlow + reachableNodes + infectionScores
-            formattedInputs = np.reshape(attackerInputs, [1, self.INPUT_SIZE])
-            modelOutput = self.model.predict(formattedInputs)[0]
-            validDestinations = [[index, score] for index, score in enumerate(modelOutput[:-1]) if reachableNodes[index]]
-            validDestinations.append([len(modelOutput) - 1, modelOutput[-1]])
-            destinationIndex = max(validDestinations, key=lambda x: x[1])[0]
-
-        message = self.buildAttackMessage(destinationIndex, infectedNodes, graph)
+        destinationIndex = self.chooseAttacks([[trafficFlow, reachableNodes, infectionScores]])[0]
+        message = self.buildAttackMessage(destinationIndex, frontier)
         return message, destinationIndex
 
-    def buildAttackMessage(self, destinationIndex, infectedNodes, graph):
+    def chooseAttacks(self, observations):
+        """Picks the node to attack for a whole set of game states, running the model a single time on every non random pick
+        Parameters
+        ----------
+        observations
+            List of [trafficFlow, reachableNodes, infectionScores] entries, one per game state, laid out as in getAttack
+
+        Returns
+        -------
+        destinationIndices
+            List with the index of the node to attack for each game state, one greater than the last node for a "bye"
+        """
+        attackerInputs = np.array([np.concatenate(observation) for observation in observations], dtype= np.float32)
+        validDestinations = np.ones((len(observations), self.OUTPUT_SIZE), dtype= bool)
+        validDestinations[:, :-1] = attackerInputs[:, self.REACHABLE_NODES_INDEX : self.INFECTION_SCORES_INDEX] != 0
+
+        scores = np.random.random(validDestinations.shape)  # Random moves pick uniformly among the valid destinations
+        modelPicks = np.flatnonzero(np.random.random(len(observations)) >= self.epsilon)
+        if len(modelPicks) > 0:
+            scores[modelPicks] = self.model.predict(attackerInputs[modelPicks], verbose= 0)
+        scores[~validDestinations] = -np.inf
+        return np.argmax(scores, axis= 1).tolist()
+
+    def buildAttackMessage(self, destinationIndex, frontier):
         """Builds up the attack message for the desired node to infect
         Parameters
         ----------
         destinationIndex
-            Integer index of the desired node to attack from the graph
-
-        infectedNodes
-            List of the IPs of the infected nodes in the graph
+            Integer id of the desired node to attack from the graph
 
-        graph
-            networkx graph of the current state of the network
+        frontier
+            InfectionFrontier tracking which infected nodes can attack each reachable node
 
         Returns
         -------
@@ -128,36 +151,27 @@ class Attacker(Agent):
             The final attack message to return to the engine
         """
         if destinationIndex == self.OUTPUT_SIZE - 1: return None
-        nodes = list(graph.nodes())
-        destination = nodes[destinationIndex]
-        origin = self.findAttackPath(destination, infectedNodes, graph)
+        destination = destinationIndex
+        origin = self.findAttackPath(destination, frontier)
         message = self.getRandomAttackMessage(origin, destination)
         return message
 
-    def findAttackPath(self, destination, infectedNodes, graph):
+    def findAttackPath(self, destination, frontier):
         """Finds the infected node that can attack the reachable node
         Parameters
         ----------
         destination
-            IP of the desired node to attack
-
-        infectedNodes
-            List of the IPs of the infected nodes in the graph
+            Node id of the desired node to attack
 
-        graph
-            networkx graph of the current state of the network
+        frontier
+            InfectionFrontier tracking which infected nodes can attack each reachable node
 
         Returns
         -------
         origin
-            IP of the infected node to launch the attack from
+            Node id of the earliest infected node with a live edge to the destination
         """
-        origin = None
-        for node in infectedNodes:
-           if graph.has_edge(node, destination):
-               origin = node
-               break
-        return origin
+        return frontier.findAttacker(destination)
 
     def getRandomAttackMessage(self, origin, destination):
         """Gets a random malicious message from the dataset
@@ -165,25 +179,22 @@ class Attacker(Agent):
         Parameters
         ----------
         origin
-            IP of the infected node to launch the attack from
+            Node id of the infected node to launch the attack from
 
         destination
-            IP of the desired node to attack
+            Node id of the desired node to attack
 
         Returns
         -------
         message
             Message object containing metadata of the attack message
         """
-        index = random.randint(0, len(self.dataset.index) - 1)
-        row = self.dataset.iloc[index]
-        row[Message.ORIGIN_INDEX] = origin
-        row[Message.DESTINATION_INDEX] = destination
-        message = Message(row)
+        index = self.dataset.sampleRows(1)[0]
+        message = self.dataset.buildMessage(index, origin, destination)
         return message
 
     def train(self):
-        """Reviews the game memory and runs through one epoch of training for the model
+        """Replays a sample of the replay memory in one batched pass, running minibatch training epochs over it
         Parameters
         ----------
         None
@@ -192,16 +203,14 @@ class Attacker(Agent):
         -------
         None
         """
-        minibatch = random.sample(self.memory, len(self.memory))
         self.lossHistory.losses_clear()
-        for attackerInputs, indexChoice, reward, in minibatch:     
-            formattedInputs = np.reshape(attackerInputs, [1, self.INPUT_SIZE])
-            modelOutput = self.model.predict(formattedInputs)[0]
-            modelOutput[indexChoice] = reward
-            for index, output in enumerate(modelOutput[:-1]):
-               if formattedInputs[0][self.REACHABLE_NODES_INDEX + index] == 0: modelOutput[index] = 0
-            modelOutput = np.reshape(modelOutput, [1, self.OUTPUT_SIZE])
-            self.model.fit(formattedInputs, modelOutput, epochs= 1, verbose= 0, callbacks= [self.lossHistory])
+        if len(self.memory) > 0:
+            indices, attackerInputs, indexChoices, rewards, validDestinations, weights = self.sampleMemory()
+            modelOutputs = self.model.predict(attackerInputs, verbose= 0)
+            self.updatePriorities(indices, modelOutputs, indexChoices, rewards)
+            modelOutputs[np.arange(len(modelOutputs)), indexChoices] = rewards
+            modelOutputs[~validDestinations] = 0
+            self.fitBatch(attackerInputs, modelOutputs, sampleWeights= weights)
 
         if self.epsilon > Agent.EPSILON_MIN: self.epsilon *= Agent.DEFAULT_EPSILON_DECAY
 
@@ -224,7 +233,9 @@ class Attacker(Agent):
         None
         """
         self.score += reward
-        self.memory.append([attackerInputs, attackIndex, reward])
+        validDestinations = np.ones(self.OUTPUT_SIZE, dtype= bool)
+        validDestinations[:-1] = attackerInputs[self.REACHABLE_NODES_INDEX : self.INFECTION_SCORES_INDEX]
+        self.memory.add(attackerInputs, attackIndex, reward, validDestinations)
 
 if __name__ == "__main__":
     pass
@@ -239,7 +250,8 @@ if __name__ == "__main__":
 
     # attacker = Attacker("../datasets/defaultAttackDataset.csv", len(graph.nodes()), epsilon= epsilon)
     # trafficInfo = [2, 1, 3, 0, 1, 0, 0, 1, 0]
-    # infectedNodes = [0]
+    # frontier = InfectionFrontier(graph, graphLen)
+    # frontier.infectNode(0)
     # attackIndex = 1
     # reward = 10
 
@@ -247,11 +259,11 @@ if __name__ == "__main__":
     # reachable = trafficInfo[attacker.REACHABLE_NODES_INDEX : int(attacker.REACHABLE_NODES_INDEX+(attacker.INPUT_SIZE/3))]
     # infectionScores = trafficInfo[attacker.INFECTION_SCORES_INDEX : int(attacker.INFECTION_SCORES_INDEX+(attacker.INPUT_SIZE/3))]
     # print('Pre load: ')
-    # attacker.getAttack(trafficFlow, reachable, infectionScores, infectedNodes, graph)
+    # attacker.getAttack(trafficFlow, reachable, infectionScores, frontier)
     # attacker.saveModel()
     # attacker.initializeModel()
     # print('Newly initialized model: ')
-    # attacker.getAttack(trafficFlow, reachable, infectionScores, infectedNodes, graph)
+    # attacker.getAttack(trafficFlow, reachable, infectionScores, frontier)
     # attacker.loadModel()
     # print('Post loading: ')
-    # attacker.getAttack(trafficFlow, reachable, infectionScores, infectedNodes, graph)
+    # attacker.getAttack(trafficFlow, reachable, infectionScores, frontier)
@@ -0,0 +1,248 @@
+# Python libraries
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+import numpy as np
+
+try:
+    import resource                                                       # Not available on windows, peak memory is then left out
+except ImportError:
+    resource = None
+
+# User defined libraries
+from GameEngine import GameEngine
+
+class Benchmark():
+    """
+        Measures how fast the simulation runs on a set of network and background traffic pairs.
+
+        Every pair gets a fresh headless GameEngine, seeded the same way and run in its own spawned process,
+        that plays a number of episodes while the players' decision calls are timed. The separate process keeps
+        the peak memory of each pair its own instead of the largest pair benchmarked so far. The players train on each episode without saving, so
+        benchmarking never touches the stored models. Results are written as JSON and can be compared
+        against the results of an earlier run to catch performance regressions.
+    """
+
+    ### Static Class Variables
+    DEFAULT_NETWORKS = ['../networks/sf_20.csv', '../networks/er_50nodes_262edges.csv', '../networks/sf_100.csv']
+    DEFAULT_DATASETS = ['../datasets/iot_20110810.binetflow_100_msg_background_traffic.csv',
+                        '../datasets/iot_20110810.binetflow_1000_msg_background_traffic.csv']
+    DEFAULT_ATTACK_PATH = '../datasets/defaultAttackDataset.csv'
+    DEFAULT_RESULTS_PATH = '../local_logs/BENCHMARK.json'
+    DEFAULT_EPISODES = 3
+    DEFAULT_EPSILON = 0.5                                                 # Mixes random and model moves so both code paths are measured
+    DEFAULT_TOLERANCE = 0.2                                               # Relative slowdown allowed before a metric counts as a regression
+
+    # Metrics compared against a baseline, mapped to whether higher values are better
+    COMPARED_METRICS = {'roundsPerSecond' : True, 'messagesPerSecond' : True, 'inspectMs' : False,
+                        'getAttackMs' : False, 'trainSecondsPerEpisode' : False, 'peakRssMb' : False}
+
+    ### Method functions
+
+    def __init__(self, networkPaths, datasetPaths, attackPath= DEFAULT_ATTACK_PATH, episodes= DEFAULT_EPISODES, seed= 0, train= True, epsilon= DEFAULT_EPSILON):
+        """Class constructor
+        Parameters
+        ----------
+        networkPaths
+            List of string file paths to the networks being benchmarked
+
+        datasetPaths
+            List of string file paths to the background traffic datasets, every network is run with every dataset
+
+        attackPath
+            String file path to the dataset used for attack messages
+
+        episodes
+            Integer number of games played per network and dataset pair
+
+        seed
+            Integer seed each pair is started from so runs are comparable
+
+        train
+            Boolean, if set the players train after every episode and the training time is measured
+
+        epsilon
+            float from 0 to 1 representing the probability that each player makes random moves
+
+        Returns
+        -------
+        None
+        """
+        self.networkPaths = networkPaths
+        self.datasetPaths = datasetPaths
+        self.attackPath = attackPath
+        self.episodes = episodes
+        self.seed = seed
+        self.train = train
+        self.epsilon = epsilon
+
+    def run(self):
+        """Benchmarks every network and dataset pair
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        results
+            Dictionary holding the benchmark settings and a list with the metrics of every pair
+        """
+        results = []
+        context = multiprocessing.get_context('spawn')               # A fresh process per pair, the peak RSS of a process never goes down
+        with context.Pool(1, maxtasksperchild= 1) as pool:
+            for networkPath in self.networkPaths:
+                for datasetPath in self.datasetPaths:
+                    result = pool.apply(self.runPair, (networkPath, datasetPath))
+                    print(Benchmark.formatResult(result))
+                    results.append(result)
+
+        settings = {'episodes' : self.episodes, 'seed' : self.seed, 'train' : self.train, 'epsilon' : self.epsilon,
+                    'attackPath' : self.attackPath, 'python' : sys.version.split()[0]}
+        return {'settings' : settings, 'results' : results}
+
+    def runPair(self, networkPath, datasetPath):
+        """Plays the benchmark episodes on one network with one background traffic dataset, run alone in a fresh process by run
+        Parameters
+        ----------
+        networkPath
+            String file path to the network
+
+        datasetPath
+            String file path to the background traffic dataset
+
+        Returns
+        -------
+        result
+            Dictionary of the metrics measured for the pair
+        """
+        random.seed(self.seed)
+        np.random.seed(self.seed)
+        setupStart = time.perf_counter()
+        engine = GameEngine(trafficPath= datasetPath, attackPath= self.attackPath, networkPath= networkPath, epsilon= self.epsilon, visualize= False)
+        setupSeconds = time.perf_counter() - setupStart
+
+        timings = {'inspect' : [0, 0.0], 'getAttack' : [0, 0.0], 'messages' : [0, 0.0]}
+        engine.defender.inspectBatch = Benchmark.timeCalls(engine.defender.inspectBatch, timings['inspect'])
+        engine.attacker.getAttack = Benchmark.timeCalls(engine.attacker.getAttack, timings['getAttack'])
+        playTraffic = engine.playTraffic
+        def countMessages(traffic, queueOrder, *args):
+            timings['messages'][0] += len(queueOrder)
+            return playTraffic(traffic, queueOrder, *args)
+        engine.playTraffic = countMessages
+
+        rounds, playSeconds, trainSeconds = 0, 0.0, 0.0
+        for episode in range(self.episodes):
+            engine.initializeGame()
+            playStart = time.perf_counter()
+            engine.runGame()
+            playSeconds += time.perf_counter() - playStart
+            rounds += engine.roundNumber
+            if self.train:
+                trainStart = time.perf_counter()
+                engine.attacker.train()
+                engine.defender.train()
+                trainSeconds += time.perf_counter() - trainStart
+
+        messages = timings['messages'][0]
+        return {'network' : os.path.basename(networkPath), 'dataset' : os.path.basename(datasetPath),
+                'nodes' : engine.graph.numNodes, 'edges' : engine.graph.numEdges, 'episodes' : self.episodes,
+                'rounds' : rounds, 'messages' : messages, 'setupSeconds' : round(setupSeconds, 4),
+                'roundsPerSecond' : round(rounds / playSeconds, 3) if playSeconds else None,
+                'messagesPerSecond' : round(messages / playSeconds, 3) if playSeconds else None,
+                'inspectMs' : Benchmark.averageMs(timings['inspect']),
+                'getAttackMs' : Benchmark.averageMs(timings['getAttack']),
+                'trainSecondsPerEpisode' : round(trainSeconds / self.episodes, 4) if self.train else None,
+                'inspectCacheHitRate' : engine.defender.predictionCache.hitRate(),
+                'peakRssMb' : Benchmark.peakRssMb()}
+
+    @staticmethod
+    def timeCalls(function, counter):
+        """Wraps a function so every call adds one to counter[0] and its run time in seconds to counter[1]"""
+        def timedFunction(*args, **kwargs):
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            counter[1] += time.perf_counter() - start
+            counter[0] += 1
+            return result
+        return timedFunction
+
+    @staticmethod
+    def averageMs(counter):
+        """Returns the average milliseconds per call of a timeCalls counter, None if it was never called"""
+        return round(1000 * counter[1] / counter[0], 4) if counter[0] else None
+
+    @staticmethod
+    def peakRssMb():
+        """Returns the peak resident memory of the process in megabytes, which only covers one pair since each pair runs in its own process, None where it can not be measured"""
+        if resource is None: return None
+        peakRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peakRss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 2)  # Reported in bytes on mac and kilobytes on linux
+
+    @staticmethod
+    def formatResult(result):
+        """Returns a one line summary of the metrics of one pair"""
+        return '{network} / {dataset}: {rounds} rounds, {roundsPerSecond} rounds/s, {messagesPerSecond} msgs/s, inspect {inspectMs} ms, ' \
+               'getAttack {getAttackMs} ms, inspect cache hit rate {inspectCacheHitRate}, train {trainSecondsPerEpisode} s/episode, peak RSS {peakRssMb} MB'.format(**result)
+
+    @staticmethod
+    def compare(results, baseline, tolerance= DEFAULT_TOLERANCE):
+        """Compares benchmark results against an earlier run
+        Parameters
+        ----------
+        results
+            Dictionary returned by run
+
+        baseline
+            Dictionary returned by an earlier run, pairs are matched on their network and dataset names
+
+        tolerance
+            float, the relative amount a metric may get worse before it is reported as a regression
+
+        Returns
+        -------
+        regressions
+            List of strings describing every metric that got worse by more than the tolerance
+        """
+        baselineResults = {(result['network'], result['dataset']) : result for result in baseline['results']}
+        regressions = []
+        for result in results['results']:
+            baselineResult = baselineResults.get((result['network'], result['dataset']))
+            if baselineResult is None: continue
+            for metric, higherIsBetter in Benchmark.COMPARED_METRICS.items():
+                value, baselineValue = result.get(metric), baselineResult.get(metric)
+                if not value or not baselineValue: continue
+                change = (value - baselineValue) / baselineValue
+                if (-change if higherIsBetter else change) > tolerance:
+                    regressions.append('{0} / {1}: {2} went from {3} to {4} ({5:+.1%})'.format(result['network'], result['dataset'], metric, baselineValue, value, change))
+        return regressions
+
+if __name__ == "__main__":
+    """Benchmarks headless games and optionally checks the results against a stored baseline"""
+    parser = argparse.ArgumentParser(description= 'Benchmarks the simulation on network and dataset pairs.')
+    parser.add_argument('-n', '--networks', nargs= '+', default= Benchmark.DEFAULT_NETWORKS, help= 'Paths to the networks being benchmarked')
+    parser.add_argument('-d', '--datasets', nargs= '+', default= Benchmark.DEFAULT_DATASETS, help= 'Paths to the background traffic datasets, every network is run with every dataset')
+    parser.add_argument('-ap', '--attackPath', type= str, default= Benchmark.DEFAULT_ATTACK_PATH, help= 'Path to the file of attack messages')
+    parser.add_argument('-ep', '--episodes', type= int, default= Benchmark.DEFAULT_EPISODES, help= 'Number of games played per network and dataset pair')
+    parser.add_argument('-s', '--seed', type= int, default= 0, help= 'Seed every pair is started from')
+    parser.add_argument('-nt', '--noTrain', action= 'store_false', help= 'set this flag to skip training between episodes')
+    parser.add_argument('-o', '--output', type= str, default= Benchmark.DEFAULT_RESULTS_PATH, help= 'Path the JSON results are written to')
+    parser.add_argument('-b', '--baseline', type= str, default= None, help= 'Path to the JSON results of an earlier run to compare against')
+    parser.add_argument('-tol', '--tolerance', type= float, default= Benchmark.DEFAULT_TOLERANCE, help= 'Relative slowdown allowed before a metric counts as a regression')
+    args = parser.parse_args()
+
+    results = Benchmark(args.networks, args.datasets, attackPath= args.attackPath, episodes= args.episodes, seed= args.seed, train= args.noTrain).run()
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent= 2)
+    print('Results written to', args.output)
+
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            regressions = Benchmark.compare(results, json.load(file), tolerance= args.tolerance)
+        for regression in regressions:
+            print('Regression:', regression)
+        if regressions: sys.exit(1)
+        print('No regressions against', args.baseline)
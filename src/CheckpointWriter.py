@@ -0,0 +1,146 @@
+# Python libraries
+import atexit
+import os
+import queue
+import re
+import threading
+import numpy as np
+
+class CheckpointWriter():
+    """
+        Writes versioned model checkpoints and training log lines from a background thread.
+
+        The caller hands over weights already copied out of the model, so the game keeps running while they
+        are written. Every checkpoint goes to its own numbered .npz file through a temporary file and an atomic
+        rename, so a crash mid write leaves the earlier checkpoints untouched, and only the newest few are kept.
+        Replay memory flushes are queued on the same thread, and pending writes are finished before the process exits.
+    """
+
+    ### Static Class Variables
+    CHECKPOINT_FILE_NAME = '{0}_v{1:06d}.npz'
+    TEMPORARY_SUFFIX = '.tmp'
+
+    ### Method functions
+
+    def __init__(self, directory, modelName, checkpointsKept):
+        """Class constructor
+        Parameters
+        ----------
+        directory
+            String path to the directory the checkpoints are written to
+
+        modelName
+            String name the checkpoint files start with
+
+        checkpointsKept
+            Integer number of newest checkpoints kept on disk, older ones are deleted
+
+        Returns
+        -------
+        None
+        """
+        self.directory = directory
+        self.modelName = modelName
+        self.checkpointsKept = max(1, checkpointsKept)                   # The newest checkpoint is never deleted
+        self.pattern = re.compile(re.escape(modelName) + r'_v(\d+)\.npz$')
+        versions = [version for version, _ in self.listCheckpoints()]
+        self.nextVersion = versions[-1] + 1 if versions else 0
+
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target= self.writeJobs, daemon= True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def listCheckpoints(self):
+        """Returns a list of (version, path) pairs of the checkpoints on disk, oldest first"""
+        if not os.path.isdir(self.directory): return []
+        checkpoints = []
+        for fileName in os.listdir(self.directory):
+            match = self.pattern.match(fileName)
+            if match: checkpoints.append((int(match.group(1)), os.path.join(self.directory, fileName)))
+        return sorted(checkpoints)
+
+    def latestCheckpoint(self):
+        """Returns the path of the newest checkpoint on disk, None if there is none"""
+        checkpoints = self.listCheckpoints()
+        return checkpoints[-1][1] if checkpoints else None
+
+    def saveWeights(self, weights):
+        """Queues a snapshot of the model weights to be written as the next checkpoint version
+        Parameters
+        ----------
+        weights
+            List of numpy arrays as returned by model.get_weights, they must not be changed afterwards
+
+        Returns
+        -------
+        None
+        """
+        self.jobs.put((self.writeCheckpoint, (weights, self.nextVersion)))
+        self.nextVersion += 1
+
+    def appendLine(self, path, line):
+        """Queues a line to be appended to a text file, such as a training log"""
+        self.jobs.put((self.writeLine, (path, line)))
+
+    def flushMemory(self, memory):
+        """Queues a ReplayMemory to be flushed to disk, with its fill state as of now"""
+        self.jobs.put((memory.flush, (memory.getHeader(),)))
+
+    def writeJobs(self):
+        """Runs in the background thread, carrying out queued writes in order until a None job arrives"""
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None: return
+                function, args = job
+                try:
+                    function(*args)
+                except Exception as error:                  # A failed write is reported and skipped, the thread must stay alive for the writes after it
+                    print('Checkpoint write failed: {0}: {1}'.format(type(error).__name__, error))
+            finally:
+                self.jobs.task_done()
+
+    def writeCheckpoint(self, weights, version):
+        """Writes one checkpoint through a temporary file and an atomic rename, then deletes checkpoints past the newest kept"""
+        os.makedirs(self.directory, exist_ok= True)
+        path = os.path.join(self.directory, CheckpointWriter.CHECKPOINT_FILE_NAME.format(self.modelName, version))
+        with open(path + CheckpointWriter.TEMPORARY_SUFFIX, 'wb') as file:
+            np.savez(file, *weights)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + CheckpointWriter.TEMPORARY_SUFFIX, path)
+        for _, oldPath in self.listCheckpoints()[:-self.checkpointsKept]:
+            os.remove(oldPath)
+
+    def writeLine(self, path, line):
+        """Appends a line to a text file"""
+        with open(path, 'a+') as file:
+            file.write(line + '\n')
+
+    def wait(self):
+        """Blocks until every queued write is finished"""
+        self.jobs.join()
+
+    def close(self):
+        """Finishes the queued writes and stops the background thread"""
+        if self.thread.is_alive():
+            self.jobs.put(None)
+            self.thread.join()
+
+    @staticmethod
+    def loadWeights(path):
+        """Reads the list of weight arrays stored in a checkpoint file"""
+        with np.load(path) as checkpoint:
+            return [checkpoint['arr_{0}'.format(index)] for index in range(len(checkpoint.files))]
+
+if __name__ == "__main__":
+    import tempfile
+    directory = tempfile.mkdtemp()
+    writer = CheckpointWriter(directory, 'TestModel', checkpointsKept= 2)
+    for step in range(4):
+        writer.saveWeights([np.full((2, 2), step), np.arange(step)])
+    writer.appendLine(os.path.join(directory, 'TestLogs'), '0.5')
+    writer.wait()
+    print(sorted(os.listdir(directory)), CheckpointWriter.loadWeights(writer.latestCheckpoint()))
+    print(CheckpointWriter(directory, 'TestModel', checkpointsKept= 2).nextVersion)
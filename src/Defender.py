@@ -5,12 +5,14 @@ import numpy as np
 # User defined libraries
 from Agent import *
 from Message import Message
+from PredictionCache import PredictionCache
 
 class Defender(Agent):
     """Agent that will try to detect malicous traffic on the network and block it"""
 
     ### Static class variables
     DEFAULT_LEARNING_RATE = .001
+    PREDICTION_CACHE_SIZE = 4096                              # Number of feature vectors whose label is remembered between inspections
 
     # Network model size constants
     INPUT_SIZE = 4
@@ -24,8 +26,9 @@ class Defender(Agent):
 
     SUSPICION_LABELS = [NO_SUSPICION_LABEL, LOW_SUSPICION_LABEL, MEDIUM_SUSPICION_LABEL, HIGH_SUSPICION_LABEL]
 
-    def __init__(self, epsilon= 1):
-        super(Defender, self).__init__(epsilon= epsilon)
+    def __init__(self, epsilon= 1, batchSize= Agent.DEFAULT_BATCH_SIZE, trainingEpochs= Agent.DEFAULT_TRAINING_EPOCHS, replayCapacity= Agent.MAX_DATA_LENGTH, replayPath= None, prioritized= False):
+        super(Defender, self).__init__(epsilon= epsilon, batchSize= batchSize, trainingEpochs= trainingEpochs, replayCapacity= replayCapacity, replayPath= replayPath, prioritized= prioritized)
+        self.predictionCache = PredictionCache(Defender.PREDICTION_CACHE_SIZE)
 
     def initializeModel(self):
         """Initializes the model of the agent
@@ -37,6 +40,7 @@ class Defender(Agent):
         -------
         None
         """
+        tf, Sequential, Dense, Adam = importBackend()
         model = Sequential()
         model.add(Dense(8, input_dim= Defender.INPUT_SIZE, activation='relu'))
         model.add(Dense(16, activation='relu'))
@@ -58,16 +62,54 @@ class Defender(Agent):
             String membership label representing the suspicion range the message belongs in
 
         """
-        if random.random() < self.epsilon:
-            return random.sample(Defender.SUSPICION_LABELS, 1)[0]
-        else:
-            formattedInputs =  np.reshape(message.asNetworkInputs(), [1, Defender.INPUT_SIZE])
-            modelOutput = self.model.predict(formattedInputs)[0]
-            index = np.argmax(modelOutput)
-            return Defender.SUSPICION_LABELS[index]
+        return self.inspectBatch(np.reshape(message.asNetworkInputs(), [1, Defender.INPUT_SIZE]))[0]
+
+    def inspectBatch(self, features):
+        """Labels a whole set of messages at once, running the model a single time on the non random picks missing from the prediction cache
+        Parameters
+        ----------
+        features
+            2D numpy array with the network inputs of one message per row, such as MessageBatch.features
+
+        Returns
+        -------
+        suspicionLabels
+            List of string membership labels, one per message in the same order as the input
+        """
+        numMessages = len(features)
+        if numMessages == 0: return []
+        labelIndices = np.random.randint(0, Defender.OUTPUT_SIZE, size= numMessages)
+        modelPicks = np.flatnonzero(np.random.random(numMessages) >= self.epsilon)
+        if len(modelPicks) > 0:
+            labelIndices[modelPicks] = self.predictLabelIndices(features[modelPicks])
+        return [Defender.SUSPICION_LABELS[index] for index in labelIndices]
+
+    def predictLabelIndices(self, features):
+        """Returns the model's label index for each feature vector, only running the model on vectors the current weights have not labeled yet
+        Parameters
+        ----------
+        features
+            2D numpy array with the network inputs of one message per row
+
+        Returns
+        -------
+        labelIndices
+            List with the index into SUSPICION_LABELS of the highest scoring label of each row
+        """
+        keys = [row.tobytes() for row in features]
+        labelIndices = self.predictionCache.lookup(keys, self.modelVersion)
+        missingRows = {}                                                  # Maps each uncached key to the rows holding it, so repeats are predicted once
+        for row, (key, labelIndex) in enumerate(zip(keys, labelIndices)):
+            if labelIndex is None: missingRows.setdefault(key, []).append(row)
+        if missingRows:
+            modelOutput = self.model.predict(features[[rows[0] for rows in missingRows.values()]], verbose= 0)
+            for (key, rows), labelIndex in zip(missingRows.items(), np.argmax(modelOutput, axis= 1).tolist()):
+                self.predictionCache.store(key, labelIndex)
+                for row in rows: labelIndices[row] = labelIndex
+        return labelIndices
 
     def train(self):
-        """Reviews the game memory and runs through one epoch of training for the model
+        """Replays a sample of the replay memory in one batched pass, running minibatch training epochs over it
         Parameters
         ----------
         None
@@ -76,14 +118,13 @@ class Defender(Agent):
         -------
         None
         """
-        minibatch = random.sample(self.memory, len(self.memory))
         self.lossHistory.losses_clear()
-        for messageInputs, label, reward in minibatch:
-            formattedInputs = np.reshape(messageInputs, [1, Defender.INPUT_SIZE])  
-            modelOutput = self.model.predict(formattedInputs)[0]
-            modelOutput[Defender.SUSPICION_LABELS.index(label)] = reward
-            modelOutput = np.reshape(modelOutput, [1, Defender.OUTPUT_SIZE])
-            self.model.fit(formattedInputs, modelOutput, epochs= 1, verbose= 0, callbacks= [self.lossHistory])
+        if len(self.memory) > 0:
+            indices, messageInputs, labelIndices, rewards, _, weights = self.sampleMemory()
+            modelOutputs = self.model.predict(messageInputs, verbose= 0)
+            self.updatePriorities(indices, modelOutputs, labelIndices, rewards)
+            modelOutputs[np.arange(len(modelOutputs)), labelIndices] = rewards
+            self.fitBatch(messageInputs, modelOutputs, sampleWeights= weights)
 
         if self.epsilon > Agent.EPSILON_MIN: self.epsilon *= Agent.DEFAULT_EPSILON_DECAY
 
@@ -106,7 +147,7 @@ class Defender(Agent):
         None
         """
         self.score += reward
-        self.memory.append([message.asNetworkInputs(), suspicionLabel, reward])
+        self.memory.add(message.asNetworkInputs(), Defender.SUSPICION_LABELS.index(suspicionLabel), reward, True)
 
 if __name__ == "__main__":
     epsilon = 0
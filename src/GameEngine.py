@@ -1,9 +1,7 @@
 # Pyhton Libraries
 import argparse
-import networkx
 import random
-import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
 import time
 import math
 import os
@@ -11,7 +9,17 @@ import os
 # User defined libraries
 from Attacker import Attacker
 from Defender import Defender
-from Message import Message
+from InfectionFrontier import InfectionFrontier
+from Message import MessageBatch
+from NetworkLoader import NetworkLoader
+from NodeScoringAttacker import NodeScoringAttacker
+from GameLog import GameLog
+from GameRecorder import GameRecorder, NullRecorder
+from GraphRenderer import GraphRenderer
+from Profiler import NullTimer, PhaseTimer, profileCall
+from SimulationGraph import SimulationGraph
+from TrafficDataset import TrafficDataset
+from TrafficSampler import TrafficSampler
 
 class GameEngine():
     """
@@ -32,24 +40,19 @@ class GameEngine():
 
     ### Static Class Variables
     MAX_BACKGROUND_TRAFFIC_MESSAGES = 30                      # The maximum number of background messages between attacks
+    LIVE_ORIGINS_ONLY = True                                  # Background messages are only sent from nodes that still have out going edges
 
     COLOR_MAP = {Defender.NO_SUSPICION_LABEL  : 'blue', Defender.LOW_SUSPICION_LABEL  : 'yellow', Defender.MEDIUM_SUSPICION_LABEL :  'orange', Defender.HIGH_SUSPICION_LABEL : 'red'}
-    NOT_INFECTED_MARKER = 'o'                                 # Non-infected nodes show up as circles
-    INFECTED_MARKER = 'X'                                     # Infected nodes appear as filled X markers
-    GRAPH_DELAY = 2                                           # Time delay in seconds between graph updates
-    NODE_SIZE = 100                                           # Size of nodes when being graphed
+    LABEL_CODES = {label : code for code, label in enumerate(COLOR_MAP)}   # Position of each label in COLOR_MAP, nodes store their last label as this code
+    ATTACKER_TYPES = {'network' : Attacker, 'node' : NodeScoringAttacker}  # Attacker models selectable by name
 
-    # Indicies for the network file
-    NETWORK_SOURCE_IP_INDEX = 0
-    NETWORK_SINK_IP_INDEX = 1
-
-    GAME_LOG_PATH    =      '../local_logs/GAME_LOG.csv'      # Default path to the dir where game logs are saved for user review            
-    GAME_LOG_HEADERS =      'Network,Rounds Played,Defender Degree,Attacker Degree, Defender Clustering, Attacker Clustering,Num Defenders, Num Attackers'
-    GAME_ROW_STRING  =      '{0},{1},{2},{3},{4},{5},{6},{7}\n'
+    GAME_LOG_DIR_PATH =     '../local_logs/game_log'          # Default path to the dir where the columnar game log chunks are saved, see GameLog
+    PHASE_LOG_PATH   =      '../local_logs/PHASE_LOG.csv'     # Per episode time spent in each phase of the game when profiling
+    PROFILE_PATH     =      '../local_logs/episode_{0}.prof'  # cProfile stats of a profiled episode
 
     ###  Method functions
     
-    def __init__(self, trafficPath, attackPath, networkPath, loadModels= False, epsilon= 1, visualize= True):
+    def __init__(self, trafficPath, attackPath, networkPath, loadModels= False, epsilon= 1, visualize= True, batchSize= Attacker.DEFAULT_BATCH_SIZE, trainingEpochs= Attacker.DEFAULT_TRAINING_EPOCHS, attacker= None, defender= None, profile= False, replayCapacity= Attacker.MAX_DATA_LENGTH, replayPath= None, prioritized= False, checkpointEvery= 1, checkpointsKept= Attacker.DEFAULT_CHECKPOINTS_KEPT, attackerType= 'network', maxFps= GraphRenderer.DEFAULT_MAX_FPS, recordPath= None, reservoirSize= None):
         """Class constructor
         Parameters
         ----------
@@ -71,51 +74,123 @@ class GameEngine():
         visualize
             boolean representing whether or not the game should be visualized
 
+        batchSize
+            Integer number of memories per gradient step when the players train
+
+        trainingEpochs
+            Integer number of passes the players make over their game memory each time they train
+
+        attacker
+            Attacker to play with instead of building a new one, lets several engines share the same players
+
+        defender
+            Defender to play with instead of building a new one, lets several engines share the same players
+
+        profile
+            Boolean, if set the time spent in each phase of the game is accumulated and logged per episode
+
+        replayCapacity
+            Integer number of decision frames each player keeps in its replay memory across games
+
+        replayPath
+            String path to a directory the replay memories are memory mapped in, they are kept in RAM if None
+
+        prioritized
+            Boolean, if set the players replay their memories by priority instead of uniformly when training
+
+        checkpointEvery
+            Integer number of training runs between model checkpoints, the loss is still logged after every run
+
+        checkpointsKept
+            Integer number of newest checkpoints kept on disk for each player
+
+        attackerType
+            String key of ATTACKER_TYPES picking the attacker model, 'node' scores each reachable node with shared weights so the model works on any network
+
+        maxFps
+            float cap on the graph frames drawn per second when visualizing, frames are not delayed if 0
+
+        recordPath
+            String path to a directory every game's events are saved in for GameReplay, games are not recorded if None
+
+        reservoirSize
+            Integer number of background traffic rows kept across all labels when the traffic file is streamed, see TrafficDataset.load
+
         Returns
         -------
         None
         """
         self.firstGame = True
+        self.attacker = attacker
+        self.defender = defender
         self.visualizeGame = visualize
         self.trafficPath = trafficPath
         self.attackPath = attackPath
         self.networkPath = networkPath
         self.loadModels = loadModels
         self.startingEpsilon = epsilon
+        self.batchSize = batchSize
+        self.trainingEpochs = trainingEpochs
+        self.replayCapacity = replayCapacity
+        self.replayPath = replayPath
+        self.prioritized = prioritized
+        self.checkpointEvery = checkpointEvery
+        self.checkpointsKept = checkpointsKept
+        self.attackerType = attackerType
+        self.maxFps = maxFps
+        self.renderer = None
+        self.trainingRuns = 0
+        self.gameLog = None
+        self.episodesLogged = 0
+        self.playSeconds = 0.0
+        self.trainSeconds = 0.0                               # Training time since the last logged game
+        self.graph = None
+        self.timer = PhaseTimer(GameEngine.PHASE_LOG_PATH) if profile else NullTimer()
+        self.recordPath = recordPath
+        self.reservoirSize = reservoirSize
+        self.recorder = GameRecorder(recordPath, GameEngine.COLOR_MAP) if recordPath is not None else NullRecorder()
         self.initializeGame()
 
-    def initializeGame(self):
+    def initializeGame(self, resetPlayers= True):
         """Initializes the starting game state, both players, and loads in the dataset
            Should be called after each game is played to prepare for the next one
         Parameters
         ----------
-        None
+        resetPlayers
+            Boolean, if unset the players keep their memory, for engines whose shared players are reset by their owner
         
         Returns
         -------
         None
         """
-        self.colorMap = {}
         self.loadTrafficDataset(self.trafficPath)
         self.initializeNetwork(self.networkPath)
         self.roundNumber = 0
+        self.attackerScore = 0                                # Rewards of this game only, the players' own scores add up every game they play in lockstep
+        self.defenderScore = 0
 
-        if self.firstGame:
+        if self.firstGame and self.attacker is not None:
+            self.firstGame = False
+        elif self.firstGame:
             self.firstGame = False
-            self.attacker = Attacker(datasetPath= self.attackPath, networkSize= len(self.graph.nodes()), epsilon= self.startingEpsilon)
-            self.defender = Defender(epsilon= self.startingEpsilon)
+            self.attacker = GameEngine.ATTACKER_TYPES[self.attackerType](datasetPath= self.attackPath, networkSize= self.graph.numNodes, epsilon= self.startingEpsilon, batchSize= self.batchSize, trainingEpochs= self.trainingEpochs,
+                                     replayCapacity= self.replayCapacity, replayPath= self.replayPath, prioritized= self.prioritized)
+            self.defender = Defender(epsilon= self.startingEpsilon, batchSize= self.batchSize, trainingEpochs= self.trainingEpochs,
+                                     replayCapacity= self.replayCapacity, replayPath= self.replayPath, prioritized= self.prioritized)
+            self.attacker.checkpointsKept = self.checkpointsKept
+            self.defender.checkpointsKept = self.checkpointsKept
             if self.loadModels:
                 self.attacker.loadModel()
                 self.attacker.epsilon = Attacker.EPSILON_MIN
                 self.defender.loadModel()
                 self.defender.epsilon = Defender.EPSILON_MIN
-        else:
+        elif resetPlayers:
             self.attacker.prepareForNextGame()
             self.defender.prepareForNextGame()
             
         
     def loadTrafficDataset(self, trafficPath):
-        """loads in the dataset for generating background traffic
+        """loads in the dataset for generating background traffic, the file is only parsed the first time per process
         Parameters
         ----------
         trafficPath
@@ -125,10 +200,12 @@ class GameEngine():
         -------
         None
         """
-        self.dataset = pd.read_csv(trafficPath)
+        self.dataset = TrafficDataset.load(trafficPath, reservoirSize= self.reservoirSize)
 
     def initializeNetwork(self, networkPath):
-        """loads in the network parameters and creates a networkx graph
+        """loads in the network parameters and builds the simulation graph
+           Nodes are stored as integer ids in the order they appear in the file, their IPs are kept in nodeNames.
+           The graph and traffic sampler are built on the first game, later games only reset their edge masks
         Parameters
         ----------
         networkPath
@@ -138,26 +215,21 @@ class GameEngine():
         -------
         None
         """
-        plt.ion()
-        self.graph = networkx.DiGraph()
-        with open(networkPath, 'r') as file:
-            lines = file.readlines()[1:]
-            for line in lines:
-                elems = line.split(',')
-                sourceIP = elems[GameEngine.NETWORK_SOURCE_IP_INDEX].strip()
-                sinkIP = elems[GameEngine.NETWORK_SINK_IP_INDEX].strip()
-
-                if not self.graph.has_node(sourceIP):
-                    self.graph.add_node(sourceIP)
-                    self.colorMap[sourceIP] = GameEngine.COLOR_MAP[Defender.NO_SUSPICION_LABEL]
-                if not self.graph.has_node(sinkIP):
-                    self.graph.add_node(sinkIP)
-                    self.colorMap[sinkIP] = GameEngine.COLOR_MAP[Defender.NO_SUSPICION_LABEL]
-                self.graph.add_edge(sourceIP, sinkIP)
-
-        allNodes = [node for node in self.graph.nodes()]
-        self.infectedNodes = random.sample(allNodes, 1)
-        self.reachableNodes = [int(self.isReachable(node)) for node in allNodes]
+        if self.graph is None:
+            self.nodeNames, sources, sinks = NetworkLoader.load(networkPath)
+            self.graph = SimulationGraph(self.nodeNames, sources, sinks)
+            self.sampler = TrafficSampler(self.graph, liveOriginsOnly= GameEngine.LIVE_ORIGINS_ONLY)
+        else:
+            self.graph.reset()
+            self.sampler.reset()
+
+        numNodes = self.graph.numNodes
+        self.nodeLabels = np.full(numNodes, GameEngine.LABEL_CODES[Defender.NO_SUSPICION_LABEL], dtype= np.int8)
+        self.frontier = InfectionFrontier(self.graph, numNodes)
+        self.recorder.startGame(self.graph)
+        self.infectNode(random.randrange(numNodes))
+        self.infectedNodes = self.frontier.infectedNodes
+        self.reachableNodes = self.frontier.reachable
         self.quarantinedNodes = []
 
     def runGame(self):
@@ -172,36 +244,139 @@ class GameEngine():
         None
         """
         self.wait = False
+        timer = self.timer
+        gameStart = time.perf_counter()
         while not self.gameOver():
            self.roundNumber += 1
-           organizedQueues, trafficInfo, attackIndex = self.generateTrafficQueues()
+           start = timer.tic()
+           traffic, queueOrder, trafficInfo, attackIndex = self.generateTrafficQueues()
+           timer.toc('generateTrafficQueues', start)
            self.lastAttackerScore = 0
            if self.visualizeGame: self.displayGraph(displayAttack= True)
-           for queue in organizedQueues.values():
-               for message in queue:
-                   if not self.graph.has_edge(message.origin, message.destination): continue
-                   skipped = False
-                   if random.random() > self.calculateInspectionChance(len(queue)): 
-                       if self.visualizeGame: print('Current message', str(message), ' was skipped inspection')
-                       suspicionLabel = Defender.NO_SUSPICION_LABEL
-                       skipped = True
-                   else:
-                       suspicionLabel = self.defender.inspect(message)
-
-                   attackerReward, defenderReward = self.calculateScore(message, suspicionLabel)
-                   self.updateNetwork(message, suspicionLabel)
-
-                   if not skipped: self.defender.addTrainingPoint(message, suspicionLabel, defenderReward)
-                   if message.isMalicious(): 
-                       self.attacker.addTrainingPoint(trafficInfo, attackIndex, attackerReward)
-                       self.lastAttackerScore = attackerReward
-
-                   if self.visualizeGame: print('Current message', str(message), 'was given a suspicion label of:', suspicionLabel)
+           start = timer.tic()
+           suspicionLabels, skippedInspections = self.inspectTraffic(traffic, queueOrder)
+           timer.toc('inspect', start)
+           self.playTraffic(traffic, queueOrder, suspicionLabels, skippedInspections, trafficInfo, attackIndex)
            if self.visualizeGame: self.displayGraph()
+        self.playSeconds = time.perf_counter() - gameStart
+
+    def playTraffic(self, traffic, queueOrder, suspicionLabels, skippedInspections, trafficInfo, attackIndex):
+        """Delivers the queued messages of a round in order, scoring each inspection and updating the network
+        Parameters
+        ----------
+        traffic
+            MessageBatch holding every message sent this round
+
+        queueOrder
+            numpy array of indices into traffic, grouped into one queue per destination node in processing order
+
+        suspicionLabels
+            List of string suspicion labels for each entry of queueOrder
+
+        skippedInspections
+            numpy boolean array flagging the entries of queueOrder that slipped through without inspection
+
+        trafficInfo
+            Array containing information regarding each node about reachability, reward, and current traffic load
+
+        attackIndex
+            Integer representing the index in the set of graph nodes that is being attacked
+
+        Returns
+        -------
+        None
+        """
+        timer = self.timer
+        for messageIndex, suspicionLabel, skipped in zip(queueOrder.tolist(), suspicionLabels, skippedInspections.tolist()):
+            message = traffic[messageIndex]
+            if not self.graph.hasEdge(message.origin, message.destination): continue
+            if skipped and self.visualizeGame: print('Current message', str(message), ' was skipped inspection')
+
+            start = timer.tic()
+            attackerReward, defenderReward = self.calculateScore(message, suspicionLabel)
+            timer.toc('calculateScore', start)
+            self.recorder.record(GameRecorder.MESSAGE, message.origin, message.destination, label= suspicionLabel, attackerScore= attackerReward, defenderScore= defenderReward,
+                                 flags= (GameRecorder.MALICIOUS_FLAG if message.isMalicious() else 0) | (GameRecorder.SKIPPED_FLAG if skipped else 0))
+            start = timer.tic()
+            self.updateNetwork(message, suspicionLabel)
+            timer.toc('updateNetwork', start)
+
+            if not skipped:
+                self.defender.addTrainingPoint(message, suspicionLabel, defenderReward)
+                self.defenderScore += defenderReward
+            if message.isMalicious(): 
+                self.attacker.addTrainingPoint(trafficInfo, attackIndex, attackerReward)
+                self.attackerScore += attackerReward
+                self.lastAttackerScore = attackerReward
+
+            if self.visualizeGame: print('Current message', str(message), 'was given a suspicion label of:', suspicionLabel)
+
+    def inspectTraffic(self, traffic, queueOrder):
+        """Decides the inspection outcome of every queued message this round,
+           the defender labels all inspected messages in one batched pass over the traffic feature matrix
+        Parameters
+        ----------
+        traffic
+            MessageBatch holding every message sent this round
+
+        queueOrder
+            numpy array of indices into traffic, grouped into one queue per destination node in processing order
+
+        Returns
+        -------
+        suspicionLabels
+            List of string suspicion labels for each entry of queueOrder, NONE for skipped messages
+
+        skippedInspections
+            numpy boolean array flagging the entries of queueOrder that slipped through without inspection
+        """
+        skippedInspections = self.scheduleInspections(traffic, queueOrder)
+        inspectedLabels = self.defender.inspectBatch(traffic.features[queueOrder[~skippedInspections]])
+        return self.labelTraffic(skippedInspections, inspectedLabels), skippedInspections
+
+    def scheduleInspections(self, traffic, queueOrder):
+        """Decides which queued messages slip through without inspection based on the length of their queue
+        Parameters
+        ----------
+        traffic
+            MessageBatch holding every message sent this round
+
+        queueOrder
+            numpy array of indices into traffic, grouped into one queue per destination node in processing order
+
+        Returns
+        -------
+        skippedInspections
+            numpy boolean array flagging the entries of queueOrder that slip through without inspection
+        """
+        destinations = traffic.destinations[queueOrder]
+        queueLengths = np.bincount(destinations, minlength= len(self.nodeNames))[destinations]
+        inspectionChances = {queueLength : self.calculateInspectionChance(queueLength) for queueLength in set(queueLengths.tolist())}
+        return np.random.random(len(queueOrder)) > np.array([inspectionChances[queueLength] for queueLength in queueLengths.tolist()])
+
+    def labelTraffic(self, skippedInspections, inspectedLabels):
+        """Spreads the defender labels of the inspected messages over the full queue order, skipped messages get NONE
+        Parameters
+        ----------
+        skippedInspections
+            numpy boolean array flagging the entries of the queue order that slipped through without inspection
+
+        inspectedLabels
+            List of string suspicion labels for the inspected entries, in queue order
+
+        Returns
+        -------
+        suspicionLabels
+            List of string suspicion labels for each entry of the queue order
+        """
+        suspicionLabels = [Defender.NO_SUSPICION_LABEL] * len(skippedInspections)
+        for position, suspicionLabel in zip(np.flatnonzero(~skippedInspections).tolist(), inspectedLabels):
+            suspicionLabels[position] = suspicionLabel
+        return suspicionLabels
 
     def gameOver(self):
         """Returns true if one player is out of lives"""
-        return not any(self.reachableNodes)
+        return self.frontier.numReachable == 0
 
     def generateTrafficQueues(self):
         """Fills the game queue with a random number of background messages,
@@ -212,8 +387,11 @@ class GameEngine():
         
         Returns
         -------
-        organizedQueues
-            Dictionary with keys of node IPs and values representing the queue of message for that node
+        traffic
+            MessageBatch holding the background messages followed by the attack message, if there is one
+
+        queueOrder
+            numpy array of indices into traffic, grouped into one queue per destination node in node order
 
         trafficInfo
             Array containing information regarding each node about reachability, reward, and current traffic load
@@ -221,21 +399,65 @@ class GameEngine():
         attackIndex
             Integer representing the index in the set of graph nodes that is being attacked
         """
+        observation = self.observeNetwork()
+        start = self.timer.tic()
+        attackMessage, attackIndex = self.attacker.getAttack(*observation, self.frontier)
+        self.timer.toc('getAttack', start)
+        return self.queueTraffic(observation, attackMessage, attackIndex)
+
+    def observeNetwork(self):
+        """Sends out this round's background traffic and gathers the state of each node the attacker decides on
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        observation
+            List of [trafficFlow, reachable, infectionScores], each holding one entry per node.
+            These are views of the frontier's observation vector, which is kept up to date as the network changes
+        """
+        start = self.timer.tic()
         self.traffic = self.generateBackgroundTraffic()
-        organizedQueues = {node : [message for message in self.traffic if message.destination == node] for node in self.graph.nodes()}
-        
-        nodeInformation = [[len(organizedQueues[node]), self.isReachable(node), self.calculateNodeInfectionReward(node)] for node in self.graph.nodes()]
-        trafficFlow, reachable, infectionScores = list(zip(*nodeInformation))
-        trafficInfo = (trafficFlow + reachable + infectionScores)
-        
-        self.attackMessage, attackIndex = self.attacker.getAttack(trafficFlow, reachable, infectionScores, self.infectedNodes, self.graph)
+        self.timer.toc('backgroundTraffic', start)
+        self.frontier.trafficFlow[:] = np.bincount(self.traffic.destinations, minlength= len(self.nodeNames))
+        return [self.frontier.trafficFlow, self.frontier.reachable, self.frontier.infectionScores]
+
+    def queueTraffic(self, observation, attackMessage, attackIndex):
+        """Groups this round's traffic into per node queues and randomly inserts the attack message into its queue
+        Parameters
+        ----------
+        observation
+            List of [trafficFlow, reachable, infectionScores] returned by observeNetwork
+
+        attackMessage
+            Message object of the attack, None if the attacker passes this round
+
+        attackIndex
+            Integer representing the index in the set of graph nodes that is being attacked
+
+        Returns
+        -------
+        Same as generateTrafficQueues
+        """
+        trafficFlow = observation[0]
+        trafficInfo = self.frontier.observation.copy()      # Snapshot of this round's state, the frontier keeps changing as messages are played
+        queueOrder = np.argsort(self.traffic.destinations, kind= 'stable')
+        self.attackMessage = attackMessage
+        self.recorder.record(GameRecorder.ROUND_START, origin= self.roundNumber)
         if self.attackMessage != None:
-            position = random.randint(0, len(organizedQueues[self.attackMessage.destination]) + 1)
-            organizedQueues[self.attackMessage.destination].insert(position, self.attackMessage)
+            destination = self.attackMessage.destination
+            self.recorder.record(GameRecorder.ATTACK, self.attackMessage.origin, destination)
+            queueStart = np.searchsorted(self.traffic.destinations[queueOrder], destination)
+            queueLength = int(trafficFlow[destination])
+            position = queueStart + min(random.randint(0, queueLength + 1), queueLength)
+            queueOrder = np.insert(queueOrder, position, len(self.traffic))
+            self.traffic = MessageBatch.concatenate([self.traffic, self.attackMessage.batch])
         else:
+            self.recorder.record(GameRecorder.ATTACK)
             self.attacker.addTrainingPoint(trafficInfo, self.attacker.OUTPUT_SIZE - 1, 0)
             
-        return organizedQueues, trafficInfo, attackIndex
+        return self.traffic, queueOrder, trafficInfo, attackIndex
 
     def generateBackgroundTraffic(self):
         """Generate a random number of background messages from the dataset
@@ -245,23 +467,13 @@ class GameEngine():
         
         Returns
         -------
-        None
+        messages
+            MessageBatch of background messages sent along live edges of the network
         """
-        messages = []
         numMessages = random.randint(1, GameEngine.MAX_BACKGROUND_TRAFFIC_MESSAGES)
-        datasetLength = len(self.dataset.index)
-        rowIndices = [random.randint(1, datasetLength - 1) for _ in range(numMessages)]
-        rows = [list(self.dataset.iloc[index]) for index in rowIndices]
-        for row in rows:            
-            nodes = [node for node in self.graph.nodes()]
-            newOrigin = random.choice(nodes)
-            row[Message.ORIGIN_INDEX] = newOrigin
-            try:
-                row[Message.DESTINATION_INDEX] = random.choice([node for node in nodes if self.graph.has_edge(newOrigin, node)])    # Pick destination as random node that it has a connection with
-            except: 
-                continue
-            messages.append(Message(row))
-        return messages
+        origins, destinations = self.sampler.sample(numMessages)    # Destinations are random nodes the origin has a live connection with
+        rowIndices = self.dataset.sampleRows(len(origins))
+        return self.dataset.buildBatch(rowIndices, origins, destinations)
 
     def calculateInspectionChance(self, queueLength):
         """Returns the probability of checking a message based on the size of the queue it's in
@@ -283,23 +495,21 @@ class GameEngine():
         -------
         None
         """
-        self.colorMap[message.origin] = GameEngine.COLOR_MAP[label]
+        self.nodeLabels[message.origin] = GameEngine.LABEL_CODES[label]
         if label == Defender.HIGH_SUSPICION_LABEL or label == Defender.MEDIUM_SUSPICION_LABEL:
             self.quarantineNode(message.origin, message.destination, label)
         elif message.isMalicious():
             self.infectNode(message.destination)
 
-        self.reachableNodes = [int(self.isReachable(node)) for node in self.graph.nodes()]
-
     def quarantineNode(self, origin, destination, label):
         """Remove outgoing edges from a node effectively hindering it from spreading infection
         Parameters
         ----------
         origin
-            IP of the sender of the suspected infected message
+            Node id of the sender of the suspected infected message
 
         destination
-            IP of the intended receipent of the suspected infected message
+            Node id of the intended receipent of the suspected infected message
 
        label
            String label representing the suspicion category the message falls into
@@ -311,10 +521,14 @@ class GameEngine():
         """
         if label == Defender.HIGH_SUSPICION_LABEL:
             if origin not in self.quarantinedNodes: self.quarantinedNodes.append(origin)
-            out_edges = list(self.graph.out_edges(origin))
-            self.graph.remove_edges_from(out_edges)
+            removedEdges = self.graph.removeOutEdges(origin)
+            self.recorder.record(GameRecorder.QUARANTINE, origin)
         else:
-            self.graph.remove_edge(origin, destination)
+            removedEdges = self.graph.removeEdge(origin, destination)
+            self.recorder.record(GameRecorder.QUARANTINE, origin, destination)
+        for edge in removedEdges:
+            self.frontier.removeEdge(origin, int(self.graph.edgeSinks[edge]))
+            self.sampler.removeEdge(edge)
     
 
     def infectNode(self, destination):
@@ -322,14 +536,14 @@ class GameEngine():
         Parameters
         ----------
         destination
-            IP of the receipent of the infected message
+            Node id of the receipent of the infected message
 
         Returns
         -------
         None
         """
-        if destination not in self.infectedNodes:
-            self.infectedNodes.append(destination)
+        if not self.frontier.isInfected(destination): self.recorder.record(GameRecorder.INFECTION, destination= destination)
+        self.frontier.infectNode(destination)
 
     def calculateNodeInfectionReward(self, node):
         """Calculates reward for infecting the specified node
@@ -343,11 +557,7 @@ class GameEngine():
         score
             integer value representing the degree of that node to other non-infected nodes
         """
-        if node in self.infectedNodes: return 0 # No reward if currently impossible to infect
-        score = 1
-        neighbors = self.graph.neighbors(node)
-        score += len([neighbor for neighbor in neighbors if neighbor not in self.infectedNodes])
-        return score
+        return int(self.frontier.infectionScores[node])          # Kept up to date by the frontier, 0 once infected
 
     def isReachable(self, node):
         """Determines if a node is reachable for infection
@@ -361,14 +571,7 @@ class GameEngine():
         reachable
             boolean value stating whether the node is reachable by the infected nodes
         """
-        if node in self.infectedNodes:
-            return False
-
-        for infectedNode in self.infectedNodes:
-            if node in self.graph.neighbors(infectedNode): 
-                return True
-
-        return False
+        return self.frontier.isReachable(node)
 
     def displayGraph(self, displayAttack= False):
         """Displays the current network colored by past suspicion scores
@@ -381,34 +584,18 @@ class GameEngine():
         -------
         None
         """
-        infectedColorMap = [self.colorMap[node] for node in self.infectedNodes]
-        notInfectedColorMap = [self.colorMap[node] for node in self.graph.nodes()]
-  
-        
-        if displayAttack:
-            colorFilter = lambda u,v: 'r' if (self.attackMessage != None and u == self.attackMessage.origin and v == self.attackMessage.destination) else 'k'
-            weightFilter = lambda u,v: 2 if (self.attackMessage != None and u == self.attackMessage.origin and v == self.attackMessage.destination) else 1
-            colors = [colorFilter(edge[0], edge[1]) for edge in self.graph.edges()]
-            widths = [weightFilter(edge[0], edge[1]) for edge in self.graph.edges()]
-        else:
-            colors = ['k'] * len(self.graph.edges())
-            widths = [1] * len(self.graph.edges())       
-
-        sizeFilter = lambda x: GameEngine.NODE_SIZE if x not in self.infectedNodes else 1
-        nodeSizes = [sizeFilter(node) for node in self.graph.nodes()]
-
-        ax = plt.gca()
-        if displayAttack and self.attackMessage != None: ax.set_title('Pre Round Setup : Attacking ' + str(self.attackMessage.destination))
-        elif displayAttack: ax.set_title('Pre Round Setup : No Attack this Round')
-        elif self.lastAttackerScore < 0: ax.set_title('Post Round Results : Attack Repulsed')
-        elif self.lastAttackerScore > 0: ax.set_title('Post Round Results : Attack Successful')
-        else: ax.set_title('Post Round Results')
-        networkx.draw_circular(self.graph, nodelist= self.infectedNodes, node_shape= GameEngine.INFECTED_MARKER, node_color = infectedColorMap, with_labels= False, node_size= GameEngine.NODE_SIZE * 4)
-        networkx.draw_circular(self.graph, node_shape= GameEngine.NOT_INFECTED_MARKER, node_color= notInfectedColorMap, with_labels=True, node_size= nodeSizes, edge_color= colors, width= widths)
-
-        plt.show()
-        plt.pause(GameEngine.GRAPH_DELAY)
-        plt.clf()
+        start = self.timer.tic()
+        if self.renderer is None: self.renderer = GraphRenderer(self.graph, list(GameEngine.COLOR_MAP.values()), maxFps= self.maxFps)
+        attackEdge = None
+        if displayAttack and self.attackMessage != None:
+            attackEdge = (self.attackMessage.origin, self.attackMessage.destination)
+            title = 'Pre Round Setup : Attacking ' + self.nodeNames[self.attackMessage.destination]
+        elif displayAttack: title = 'Pre Round Setup : No Attack this Round'
+        elif self.lastAttackerScore < 0: title = 'Post Round Results : Attack Repulsed'
+        elif self.lastAttackerScore > 0: title = 'Post Round Results : Attack Successful'
+        else: title = 'Post Round Results'
+        self.renderer.draw(self.nodeLabels, self.frontier.infected, title, attackEdge= attackEdge)
+        self.timer.toc('displayGraph', start)
 
     def calculateScore(self, message, label):
         """Calculates the reward earned for each player and updates lives
@@ -429,7 +616,7 @@ class GameEngine():
             The score earned by the defender
         """
         attackerReward = self.calculateNodeInfectionReward(message.destination)
-        defenderReward = len([edge for edge in self.graph.neighbors(message.destination)]) + 1
+        defenderReward = self.graph.outDegree(message.destination) + 1
         if message.isMalicious() and label == Defender.HIGH_SUSPICION_LABEL:
             return [-attackerReward, defenderReward]
         elif message.isMalicious() and label == Defender.MEDIUM_SUSPICION_LABEL:
@@ -443,8 +630,33 @@ class GameEngine():
         elif not message.isMalicious():
             return [None, defenderReward]
 
-    def logGameResults(self):
-        """Return average degree, clustering coefficient, and connectedness of infected vs non-infected graph"""
+    def getGameLog(self):
+        """Returns the buffered game log of this engine, created on first use so engines that never log don't open one"""
+        if self.gameLog is None: self.gameLog = GameLog(GameEngine.GAME_LOG_DIR_PATH)
+        return self.gameLog
+
+    def logGameResults(self, gameResults= None, episode= None):
+        """Adds the results row of a game to the buffered game log, along with the training time since the last logged game
+        Parameters
+        ----------
+        gameResults
+            Dictionary row from getGameResults, defaults to the results of the game just played
+
+        episode
+            Integer episode number of the game, defaults to the number of games this engine logged before
+
+        Returns
+        -------
+        None
+        """
+        if gameResults is None: gameResults = self.getGameResults()
+        gameResults = dict(gameResults, episode= episode if episode is not None else self.episodesLogged, trainSeconds= self.trainSeconds)
+        self.getGameLog().append(gameResults)
+        self.episodesLogged += 1
+        self.trainSeconds = 0.0
+
+    def getGameResults(self):
+        """Return average degree, clustering coefficient, and connectedness of infected vs non-infected graph, the scores and play time as a game log row"""
 
         # degreeCount = collections.Counter(degree_sequence)
         # deg, cnt = zip(*degreeCount.items())
@@ -459,43 +671,48 @@ class GameEngine():
         # ax.set_xticklabels(deg)
         # plt.show()
 
+        import networkx
+        graph = self.graph.toNetworkx()
         networkFileName = self.networkPath.split('/')[-1]
         networkName = networkFileName.split('.')[0]
 
         try:
-            defenderDegrees = [d for n, d in self.graph.degree() if n not in self.infectedNodes]
+            defenderDegrees = [d for n, d in graph.degree() if not self.frontier.isInfected(n)]
             avgDefenderDegree = round(sum(defenderDegrees) / len(defenderDegrees), 3)
         except:
             avgDefenderDegree = 0
         
         try:
-            attackerDegrees = [d for n, d in self.graph.degree() if n in self.infectedNodes]
+            attackerDegrees = [d for n, d in graph.degree() if self.frontier.isInfected(n)]
             avgAttackerDegree = round(sum(attackerDegrees) / len(attackerDegrees), 3)
         except:
             avgAttackerDegree = 0
 
-        clusterings = networkx.clustering(self.graph)
+        clusterings = networkx.clustering(graph)
 
         try:
-            defenderClusterings = [clusterings[node] for node in clusterings if node not in self.infectedNodes]
+            defenderClusterings = [clusterings[node] for node in clusterings if not self.frontier.isInfected(node)]
             avgDefenderClusterings = round(sum(defenderClusterings) / len(defenderClusterings), 3)
         except:
             avgDefenderClusterings = 0
 
         try:    
-            attackerClusterings = [clusterings[node] for node in clusterings if node in self.infectedNodes]
+            attackerClusterings = [clusterings[node] for node in clusterings if self.frontier.isInfected(node)]
             avgAttackerClusterings = round(sum(attackerClusterings) / len(attackerClusterings), 3)
         except:
             avgAttackerClusterings = 0
 
-        numNotInfectedNodes = len(self.graph.nodes()) - len(self.infectedNodes)
+        numNotInfectedNodes = self.graph.numNodes - len(self.infectedNodes)
         numInfectedNodes = len(self.infectedNodes)
 
-        with open(os.path.join(GameEngine.GAME_LOG_PATH), 'a+') as file:
-            file.write(GameEngine.GAME_ROW_STRING.format(networkName,self.roundNumber,avgDefenderDegree,avgAttackerDegree,avgDefenderClusterings,avgAttackerClusterings,numNotInfectedNodes,numInfectedNodes))
+        return {'network' : networkName, 'roundsPlayed' : self.roundNumber, 'defenderDegree' : avgDefenderDegree, 'attackerDegree' : avgAttackerDegree,
+                'defenderClustering' : avgDefenderClusterings, 'attackerClustering' : avgAttackerClusterings,
+                'numDefenders' : numNotInfectedNodes, 'numAttackers' : numInfectedNodes,
+                'attackerScore' : self.attackerScore, 'defenderScore' : self.defenderScore,
+                'playSeconds' : self.playSeconds, 'timestamp' : time.time()}
 
     def train(self):
-        """starts the training runs for each player
+        """starts the training runs for each player, checkpointing their models every checkpointEvery runs
         Parameters
         ----------
         None
@@ -504,10 +721,33 @@ class GameEngine():
         -------
         None
         """
+        start = self.timer.tic()
+        trainStart = time.perf_counter()
         self.attacker.train()
         self.defender.train()
-        self.attacker.saveModel()
-        self.defender.saveModel()
+        self.trainSeconds += time.perf_counter() - trainStart
+        self.timer.toc('train', start)
+        self.trainingRuns += 1
+        start = self.timer.tic()
+        if self.trainingRuns % self.checkpointEvery == 0:
+            self.attacker.saveModel()
+            self.defender.saveModel()
+        else:
+            self.attacker.logLoss()
+            self.defender.logLoss()
+        self.timer.toc('saveModel', start)
+
+    def logPhaseTimes(self, episode):
+        """Writes the phase times of the episode to the phase log when profiling, does nothing otherwise"""
+        self.timer.logEpisode(self.getNetworkName(), episode)
+
+    def saveRecording(self, episode):
+        """Saves the events of the game just played for GameReplay when recording, does nothing otherwise"""
+        self.recorder.save(self.getNetworkName(), episode)
+
+    def getNetworkName(self):
+        """Returns the file name of the network without its directory or extension"""
+        return self.networkPath.split('/')[-1].split('.')[0]
 
 if __name__ == "__main__":
     """Runs a specified number of games, training can be turned on via the train flag"""
@@ -519,16 +759,48 @@ if __name__ == "__main__":
     parser.add_argument('-t', '--train', action= 'store_true', help= 'Whether the agents should be training at the end of each game')
     parser.add_argument('-l', '--load', action= 'store_true', help= 'Whether previous models should be loaded in for this game')
     parser.add_argument('-nv', '--noVisualize', action= 'store_false', help= 'set this flag to turn off the game visualization')
+    parser.add_argument('-bs', '--batchSize', type= int, default= Attacker.DEFAULT_BATCH_SIZE, help= 'Number of memories per gradient step when training')
+    parser.add_argument('-te', '--trainingEpochs', type= int, default= Attacker.DEFAULT_TRAINING_EPOCHS, help= 'Number of passes over the game memory each time the agents train')
+    parser.add_argument('-rc', '--replayCapacity', type= int, default= Attacker.MAX_DATA_LENGTH, help= 'Number of decision frames each player keeps in its replay memory across games')
+    parser.add_argument('-rp', '--replayPath', type= str, default= None, help= 'Directory to memory map the replay memories in so they outgrow RAM and persist between runs')
+    parser.add_argument('-pr', '--prioritized', action= 'store_true', help= 'Whether the players replay the decisions they were furthest off on more often when training')
+    parser.add_argument('-ce', '--checkpointEvery', type= int, default= 1, help= 'Number of episodes trained between model checkpoints')
+    parser.add_argument('-ck', '--checkpointsKept', type= int, default= Attacker.DEFAULT_CHECKPOINTS_KEPT, help= 'Number of newest model checkpoints kept on disk for each player')
+    parser.add_argument('-fps', '--maxFps', type= float, default= GraphRenderer.DEFAULT_MAX_FPS, help= 'Most graph frames drawn per second when visualizing, 0 draws as fast as possible')
+    parser.add_argument('-rec', '--recordPath', type= str, default= None, help= 'Directory every game is recorded in, see GameReplay.py to watch the recordings')
+    parser.add_argument('-rs', '--reservoirSize', type= int, default= None, help= 'Background traffic rows kept in total, split evenly over the labels, when streaming the traffic file, large files are streamed even if not set')
+    parser.add_argument('-at', '--attackerType', type= str, default= 'network', choices= sorted(GameEngine.ATTACKER_TYPES), help= "Attacker model, 'node' scores each reachable node with shared weights and works on any network size")
+    parser.add_argument('-w', '--workers', type= int, default= 1, help= 'Number of processes playing episodes in parallel, the models are trained in the main process')
+    parser.add_argument('-ve', '--vectorEnvironments', type= int, default= 1, help= 'Number of headless games stepped in lockstep so each player decides for all of them in one model call, the game is not visualized when above 1')
+    parser.add_argument('-p', '--profile', action= 'store_true', help= 'Whether the time spent in each phase of the game is logged per episode to local_logs/PHASE_LOG.csv')
+    parser.add_argument('-pe', '--profileEpisode', type= int, default= None, help= 'Episode to run under cProfile, the stats are saved to local_logs/episode_<number>.prof')
+    parser.add_argument('-s', '--seed', type= int, default= None, help= 'Seed for the random number generators, episodes are seeded from it when running with several workers')
     args = parser.parse_args()
 
-    engine = GameEngine(trafficPath= args.trafficPath, attackPath= args.attackPath, networkPath= args.networkPath, loadModels= args.load, visualize= args.noVisualize)
-
-    for episode in range(args.episodes):
-        engine.initializeGame()
-        print('Starting episode', episode)
-        engine.runGame()
-        print('Episode', episode, 'complete')
-        engine.logGameResults()
-        if args.train:
-            engine.train()
-            print('Training for episode', episode, 'complete')
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+
+    engine = GameEngine(trafficPath= args.trafficPath, attackPath= args.attackPath, networkPath= args.networkPath, loadModels= args.load, visualize= args.noVisualize, batchSize= args.batchSize, trainingEpochs= args.trainingEpochs, profile= args.profile,
+                        replayCapacity= args.replayCapacity, replayPath= args.replayPath, prioritized= args.prioritized,
+                        checkpointEvery= args.checkpointEvery, checkpointsKept= args.checkpointsKept, attackerType= args.attackerType, maxFps= args.maxFps, recordPath= args.recordPath, reservoirSize= args.reservoirSize)
+
+    if args.workers > 1:
+        from ParallelGameRunner import ParallelGameRunner
+        ParallelGameRunner(engine, numWorkers= args.workers, seed= args.seed).run(args.episodes, train= args.train)
+    elif args.vectorEnvironments > 1:
+        from VecGameEngine import VecGameEngine
+        VecGameEngine(engine, numEnvironments= args.vectorEnvironments).run(args.episodes, train= args.train)
+    else:
+        for episode in range(args.episodes):
+            engine.initializeGame()
+            print('Starting episode', episode)
+            if episode == args.profileEpisode: profileCall(engine.runGame, GameEngine.PROFILE_PATH.format(episode))
+            else: engine.runGame()
+            print('Episode', episode, 'complete')
+            if args.train:
+                engine.train()
+                print('Training for episode', episode, 'complete')
+            engine.logGameResults(episode= episode)
+            engine.logPhaseTimes(episode)
+            engine.saveRecording(episode)
@@ -0,0 +1,159 @@
+# Python libraries
+import argparse
+import atexit
+import os
+import re
+import time
+import numpy as np
+
+def loadParquet():
+    """Imports pyarrow's parquet module on first use, returns None if pyarrow is not installed"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+class GameLog():
+    """
+        Buffered columnar log of game results.
+
+        Rows are gathered in memory, one list per column, and written out in chunks of many games. Each chunk
+        is its own file in the log directory, named after the start time and id of the writing process, so
+        processes never append to the same file and read returns the rows of earlier runs first. Chunks are Parquet files when pyarrow is installed and npz files of numpy columns
+        otherwise. read loads every chunk of a directory back as one array per column.
+    """
+
+    ### Static Class Variables
+    DEFAULT_CHUNK_ROWS = 1000                                 # Number of games buffered before a chunk is written
+    CHUNK_FILE_NAME = 'chunk_{0}_{1}_{2:06d}{3}'              # Process start time, process id, chunk number and extension
+    CHUNK_FILE_PATTERN = re.compile(r'chunk_(\d+)_(\d+)_(\d+)\.')
+    PARQUET_EXTENSION = '.parquet'
+    NPZ_EXTENSION = '.npz'
+    TEMPORARY_SUFFIX = '.tmp'
+
+    # Columns of the log and the numpy type each is stored as
+    COLUMNS = [('network', str), ('episode', np.int64), ('roundsPlayed', np.int64),
+               ('defenderDegree', np.float64), ('attackerDegree', np.float64),
+               ('defenderClustering', np.float64), ('attackerClustering', np.float64),
+               ('numDefenders', np.int64), ('numAttackers', np.int64),
+               ('attackerScore', np.float64), ('defenderScore', np.float64),
+               ('playSeconds', np.float64), ('trainSeconds', np.float64), ('timestamp', np.float64)]
+
+    ### Method functions
+
+    def __init__(self, directory, chunkRows= DEFAULT_CHUNK_ROWS):
+        """Class constructor
+        Parameters
+        ----------
+        directory
+            String path to the directory the chunk files are written to
+
+        chunkRows
+            Integer number of rows buffered before they are written as a chunk
+
+        Returns
+        -------
+        None
+        """
+        self.directory = directory
+        self.chunkRows = chunkRows
+        self.startTime = int(time.time())
+        self.numChunks = 0
+        self.clearBuffer()
+        atexit.register(self.flush)
+
+    def clearBuffer(self):
+        """Empties the in memory rows"""
+        self.buffer = {name : [] for name, _ in GameLog.COLUMNS}
+        self.numRows = 0
+
+    def append(self, row):
+        """Buffers one game's results, writing a chunk once enough rows are gathered
+        Parameters
+        ----------
+        row
+            Dictionary with a value for every column, missing columns are stored as NaN or -1
+
+        Returns
+        -------
+        None
+        """
+        for name, columnType in GameLog.COLUMNS:
+            self.buffer[name].append(row.get(name, '' if columnType is str else (np.nan if columnType is np.float64 else -1)))
+        self.numRows += 1
+        if self.numRows >= self.chunkRows: self.flush()
+
+    def flush(self):
+        """Writes the buffered rows as a new chunk file, through a temporary file and an atomic rename"""
+        if self.numRows == 0: return
+        columns = {name : np.array(self.buffer[name], dtype= columnType) for name, columnType in GameLog.COLUMNS}
+        pyarrow = loadParquet()
+        extension = GameLog.PARQUET_EXTENSION if pyarrow is not None else GameLog.NPZ_EXTENSION
+        path = os.path.join(self.directory, GameLog.CHUNK_FILE_NAME.format(self.startTime, os.getpid(), self.numChunks, extension))
+        os.makedirs(self.directory, exist_ok= True)
+        temporaryPath = path + GameLog.TEMPORARY_SUFFIX
+        if pyarrow is not None:
+            pyarrow.parquet.write_table(pyarrow.table(columns), temporaryPath)
+        else:
+            with open(temporaryPath, 'wb') as file:
+                np.savez(file, **columns)
+        os.replace(temporaryPath, path)
+        self.numChunks += 1
+        self.clearBuffer()
+
+    @staticmethod
+    def read(directory):
+        """Loads every chunk in a log directory
+        Parameters
+        ----------
+        directory
+            String path to the log directory
+
+        Returns
+        -------
+        columns
+            Dictionary mapping each column name to a numpy array with one entry per logged game, ordered by the start time of the
+            run that logged it, then by process id and chunk number, so the games of each run stay in episode order
+        """
+        chunks = {name : [] for name, _ in GameLog.COLUMNS}
+        fileNames = [fileName for fileName in os.listdir(directory) if GameLog.CHUNK_FILE_PATTERN.match(fileName)] if os.path.isdir(directory) else []
+        fileNames.sort(key= lambda fileName: tuple(int(number) for number in GameLog.CHUNK_FILE_PATTERN.match(fileName).groups()))  # Numeric so a longer process id never sorts early
+        for fileName in fileNames:
+            path = os.path.join(directory, fileName)
+            if fileName.endswith(GameLog.NPZ_EXTENSION):
+                with np.load(path) as chunk:
+                    for name in chunks: chunks[name].append(chunk[name])
+            elif fileName.endswith(GameLog.PARQUET_EXTENSION):
+                pyarrow = loadParquet()
+                if pyarrow is None: raise ImportError('{0} was written as Parquet, pyarrow must be installed to read it'.format(path))
+                table = pyarrow.parquet.read_table(path)
+                for name in chunks: chunks[name].append(table.column(name).to_numpy())
+        return {name : np.concatenate(arrays).astype(columnType) if arrays else np.zeros(0, dtype= columnType) for (name, columnType), arrays in zip(GameLog.COLUMNS, chunks.values())}
+
+    @staticmethod
+    def writeCsv(columns, path):
+        """Writes the columns returned by read to a csv file for review"""
+        names = [name for name, _ in GameLog.COLUMNS]
+        with open(path, 'w') as file:
+            file.write(','.join(names) + '\n')
+            for row in zip(*[columns[name].tolist() for name in names]):
+                file.write(','.join(str(value) for value in row) + '\n')
+
+if __name__ == "__main__":
+    """Summarizes a game log directory and optionally exports it to csv"""
+    parser = argparse.ArgumentParser(description= 'Reads a columnar game log.')
+    parser.add_argument('-d', '--directory', type= str, default= '../local_logs/game_log', help= 'Path to the game log directory')
+    parser.add_argument('-o', '--output', type= str, default= None, help= 'Path of a csv file to export the whole log to')
+    args = parser.parse_args()
+
+    columns = GameLog.read(args.directory)
+    numGames = len(columns['episode'])
+    print(numGames, 'games logged in', args.directory)
+    for network in np.unique(columns['network']):
+        games = columns['network'] == network
+        print('{0}: {1} games, {2:.2f} rounds, {3:.2f} infected nodes on average'.format(network, int(games.sum()), columns['roundsPlayed'][games].mean(), columns['numAttackers'][games].mean()))
+    if args.output is not None:
+        GameLog.writeCsv(columns, args.output)
+        print('Log exported to', args.output)
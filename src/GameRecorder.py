@@ -0,0 +1,107 @@
+# Python libraries
+import os
+import numpy as np
+
+class GameRecorder():
+    """
+        Records the events of a game as a compact binary stream so it can be replayed later without the models.
+
+        Every event is one fixed size record: round starts, the attack chosen, the label and scores of each
+        delivered message, quarantines and infections. While the game runs, events are appended to a plain
+        list as tuples, which costs about as much as a function call. When the game is saved they are packed
+        into one numpy record array and written together with the network's edges and node names, so a
+        recording can be replayed on its own, see GameReplay.
+    """
+
+    ### Static Class Variables
+    ROUND_START = 0                                           # origin holds the round number
+    ATTACK = 1                                                # origin and destination of the attack, both -1 for a bye
+    MESSAGE = 2                                               # A delivered message with its label, flags and the rewards of both players
+    QUARANTINE = 3                                            # Edge origin to destination removed, destination is -1 when every out going edge of origin was
+    INFECTION = 4                                             # destination was infected
+    MALICIOUS_FLAG = 1                                        # Flag bits of MESSAGE events
+    SKIPPED_FLAG = 2
+    EVENT_TYPE = np.dtype([('kind', np.uint8), ('label', np.uint8), ('flags', np.uint8), ('origin', np.int32), ('destination', np.int32),
+                           ('attackerScore', np.float32), ('defenderScore', np.float32)])
+    RECORDING_FILE_NAME = '{0}_episode_{1:06d}.npz'           # Network name and episode number
+
+    ### Method functions
+
+    def __init__(self, directory, labelColors):
+        """Class constructor
+        Parameters
+        ----------
+        directory
+            String path to the directory recordings are saved in
+
+        labelColors
+            Dictionary mapping every suspicion label to the color nodes are drawn in, labels are stored as their position in it
+
+        Returns
+        -------
+        None
+        """
+        self.directory = directory
+        self.labelCodes = {label : code for code, label in enumerate(labelColors)}
+        self.labelColors = list(labelColors.values())
+        self.graph = None
+        self.events = []
+
+    def startGame(self, graph):
+        """Drops the events of the previous game and remembers the network of the new one"""
+        self.graph = graph
+        self.events = []
+
+    def record(self, kind, origin= -1, destination= -1, label= None, flags= 0, attackerScore= None, defenderScore= None):
+        """Appends one event to the current game, see the event kinds at the top of the class for what each field holds"""
+        self.events.append((kind, self.labelCodes[label] if label is not None else 0, flags, origin, destination,
+                            np.nan if attackerScore is None else attackerScore, np.nan if defenderScore is None else defenderScore))
+
+    def save(self, networkName, episode):
+        """Writes the current game to {directory}/{networkName}_episode_{episode}.npz
+        Parameters
+        ----------
+        networkName
+            String name of the network the game was played on
+
+        episode
+            Integer episode number of the game
+
+        Returns
+        -------
+        path
+            String path of the written recording
+        """
+        os.makedirs(self.directory, exist_ok= True)
+        path = os.path.join(self.directory, GameRecorder.RECORDING_FILE_NAME.format(networkName, episode))
+        np.savez_compressed(path, events= np.array(self.events, dtype= GameRecorder.EVENT_TYPE), nodeNames= np.array(self.graph.nodeNames),
+                            sources= self.graph.edgeSources, sinks= self.graph.edgeSinks, labelColors= np.array(self.labelColors))
+        return path
+
+    @staticmethod
+    def load(path):
+        """Reads a recording back as a dictionary of its events, nodeNames, sources, sinks and labelColors arrays"""
+        with np.load(path) as recording:
+            return {name : recording[name] for name in recording.files}
+
+class NullRecorder():
+    """Stand in for GameRecorder when games are not recorded, every method does nothing"""
+
+    def startGame(self, graph):
+        pass
+
+    def record(self, kind, origin= -1, destination= -1, label= None, flags= 0, attackerScore= None, defenderScore= None):
+        pass
+
+    def save(self, networkName, episode):
+        return None
+
+if __name__ == "__main__":
+    import tempfile
+    from SimulationGraph import SimulationGraph
+    recorder = GameRecorder(tempfile.mkdtemp(), {'NONE' : 'blue', 'HIGH' : 'red'})
+    recorder.startGame(SimulationGraph(['a', 'b'], [0, 1], [1, 0]))
+    recorder.record(GameRecorder.ROUND_START, origin= 1)
+    recorder.record(GameRecorder.MESSAGE, 0, 1, label= 'HIGH', flags= GameRecorder.MALICIOUS_FLAG, attackerScore= -2, defenderScore= 2)
+    recording = GameRecorder.load(recorder.save('test', 0))
+    print(recording['events'], recording['nodeNames'], recording['labelColors'], GameRecorder.EVENT_TYPE.itemsize)
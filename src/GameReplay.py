@@ -0,0 +1,140 @@
+# Python libraries
+import argparse
+import os
+import numpy as np
+
+# User defined libraries
+from GameRecorder import GameRecorder
+from GraphRenderer import GraphRenderer
+from SimulationGraph import SimulationGraph
+
+class GameReplay():
+    """
+        Replays a game recorded by GameRecorder.
+
+        The recorded events are applied to a fresh SimulationGraph one at a time, and a frame is made at the
+        same two points of every round the live visualization draws at, once the attack is chosen and once
+        the round's messages are delivered. Only numpy, matplotlib and the graph classes are loaded, never the
+        models, so games can be watched or turned into frames and videos long after they were played.
+    """
+
+    ### Static Class Variables
+    VIDEO_EXTENSIONS = ('.mp4', '.gif')                       # Outputs ending in these are written as a video, any other output is a directory of png frames
+    FRAME_FILE_NAME = 'frame_{0:06d}.png'
+    VIDEO_FPS = 2
+
+    ### Method functions
+
+    def __init__(self, path):
+        """Class constructor
+        Parameters
+        ----------
+        path
+            String path to a recording saved by GameRecorder
+
+        Returns
+        -------
+        None
+        """
+        recording = GameRecorder.load(path)
+        self.events = recording['events']
+        self.labelColors = recording['labelColors'].tolist()
+        self.graph = SimulationGraph(recording['nodeNames'].tolist(), recording['sources'], recording['sinks'])
+
+    def frames(self):
+        """Applies the recorded events in order, yielding after every point the game would have been drawn at
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        frames
+            Generator of (nodeLabels, infected, title, attackEdge) tuples, the arguments of GraphRenderer.draw
+        """
+        self.graph.reset()
+        nodeLabels = np.zeros(self.graph.numNodes, dtype= np.int8)
+        infected = np.zeros(self.graph.numNodes, dtype= bool)
+        names = self.graph.nodeNames
+        lastAttackerScore, roundStarted = 0, False
+        for kind, label, flags, origin, destination, attackerScore, _ in self.events.tolist():
+            if kind == GameRecorder.ROUND_START:
+                if roundStarted: yield nodeLabels, infected, GameReplay.resultTitle(lastAttackerScore), None
+                lastAttackerScore, roundStarted = 0, True
+            elif kind == GameRecorder.ATTACK and origin < 0:
+                yield nodeLabels, infected, 'Pre Round Setup : No Attack this Round', None
+            elif kind == GameRecorder.ATTACK:
+                yield nodeLabels, infected, 'Pre Round Setup : Attacking ' + names[destination], (origin, destination)
+            elif kind == GameRecorder.MESSAGE:
+                nodeLabels[origin] = label
+                if flags & GameRecorder.MALICIOUS_FLAG: lastAttackerScore = attackerScore
+            elif kind == GameRecorder.QUARANTINE and destination < 0:
+                self.graph.removeOutEdges(origin)
+            elif kind == GameRecorder.QUARANTINE:
+                self.graph.removeEdge(origin, destination)
+            elif kind == GameRecorder.INFECTION:
+                infected[destination] = True
+        if roundStarted: yield nodeLabels, infected, GameReplay.resultTitle(lastAttackerScore), None
+
+    @staticmethod
+    def resultTitle(lastAttackerScore):
+        """Returns the title shown once a round's messages are delivered"""
+        if lastAttackerScore < 0: return 'Post Round Results : Attack Repulsed'
+        elif lastAttackerScore > 0: return 'Post Round Results : Attack Successful'
+        return 'Post Round Results'
+
+    def show(self, maxFps= GraphRenderer.DEFAULT_MAX_FPS):
+        """Plays the game back in an interactive window"""
+        renderer = GraphRenderer(self.graph, self.labelColors, maxFps= maxFps)
+        for frame in self.frames():
+            renderer.draw(*frame)
+
+    def write(self, output, dpi= None):
+        """Renders every frame off screen with the Agg backend
+        Parameters
+        ----------
+        output
+            String path of a .mp4 or .gif video, or of a directory the frames are saved in as png files
+
+        dpi
+            Integer resolution of the frames, the matplotlib default if None
+
+        Returns
+        -------
+        numFrames
+            Integer number of frames written
+        """
+        import matplotlib
+        matplotlib.use('Agg')
+        renderer = GraphRenderer(self.graph, self.labelColors, maxFps= 0)
+        numFrames = 0
+        if output.endswith(GameReplay.VIDEO_EXTENSIONS):
+            from matplotlib import animation
+            writer = animation.PillowWriter(fps= GameReplay.VIDEO_FPS) if output.endswith('.gif') else animation.FFMpegWriter(fps= GameReplay.VIDEO_FPS)
+            with writer.saving(renderer.figure, output, dpi if dpi is not None else renderer.figure.dpi):
+                for frame in self.frames():
+                    renderer.update(*frame)
+                    writer.grab_frame()
+                    numFrames += 1
+        else:
+            os.makedirs(output, exist_ok= True)
+            for frame in self.frames():
+                renderer.update(*frame)
+                renderer.figure.savefig(os.path.join(output, GameReplay.FRAME_FILE_NAME.format(numFrames)), dpi= dpi)
+                numFrames += 1
+        return numFrames
+
+if __name__ == "__main__":
+    """Replays a recorded game in a window, or writes it out as frames or a video"""
+    parser = argparse.ArgumentParser(description= 'Replays a game recorded with the GameEngine --recordPath flag.')
+    parser.add_argument('recording', type= str, help= 'Path to the recorded game')
+    parser.add_argument('-o', '--output', type= str, default= None, help= 'Directory to save png frames in, or a .mp4 or .gif video path, the game is shown in a window if not set')
+    parser.add_argument('-fps', '--maxFps', type= float, default= GraphRenderer.DEFAULT_MAX_FPS, help= 'Most frames shown per second in the window')
+    parser.add_argument('-dpi', '--dpi', type= int, default= None, help= 'Resolution of the written frames')
+    args = parser.parse_args()
+
+    replay = GameReplay(args.recording)
+    if args.output is None:
+        replay.show(maxFps= args.maxFps)
+    else:
+        print(replay.write(args.output, dpi= args.dpi), 'frames written to', args.output)
@@ -0,0 +1,134 @@
+# Python libraries
+import time
+import numpy as np
+
+class GraphRenderer():
+    """
+        Draws the live state of a SimulationGraph into one persistent matplotlib figure.
+
+        Node positions are laid out on a circle once per network, and the nodes, infected markers, edges and
+        labels are created as matplotlib artists a single time. Every frame only rewrites the colors, sizes
+        and widths of those artists from the engine's arrays, so drawing costs no layout and no artist
+        creation. Node colors come from a per node array of label codes looked up in a fixed RGBA table,
+        so no color strings are parsed per frame. Frames are capped at maxFps per second instead of sleeping a fixed delay after each one.
+    """
+
+    ### Static Class Variables
+    NOT_INFECTED_MARKER = 'o'                                 # Non-infected nodes show up as circles
+    INFECTED_MARKER = 'X'                                     # Infected nodes appear as filled X markers
+    NODE_SIZE = 100                                           # Size of nodes when being graphed
+    INFECTED_NODE_SIZE = NODE_SIZE * 4
+    MAX_LABELED_NODES = 200                                   # Node names are left out on larger networks, they would cover the graph
+    DEFAULT_MAX_FPS = 0.5                                     # Frames drawn per second at most, the pace of the old fixed 2 second delay
+    MIN_PAUSE = 0.001                                         # Shortest pause, long enough for matplotlib to process window events
+    EDGE_COLOR = 'k'
+    ATTACK_EDGE_COLOR = 'r'
+    ATTACK_EDGE_WIDTH = 2
+
+    ### Method functions
+
+    def __init__(self, graph, labelColors, maxFps= DEFAULT_MAX_FPS):
+        """Class constructor, lays out the network and creates its artists
+        Parameters
+        ----------
+        graph
+            SimulationGraph being drawn, its node names label the nodes and its alive mask is read on every frame
+
+        labelColors
+            List of the matplotlib color of each label code, in code order
+
+        maxFps
+            float cap on the frames drawn per second, frames are not delayed at all if 0 or None
+
+        Returns
+        -------
+        None
+        """
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import LineCollection
+        from matplotlib.colors import to_rgba, to_rgba_array
+        self.plt = plt
+        self.labelRgba = to_rgba_array(labelColors)                     # Row i holds the RGBA color of label code i
+        self.graph = graph
+        self.frameInterval = 1 / maxFps if maxFps else 0
+        self.lastFrame = None
+
+        angles = 2 * np.pi * np.arange(graph.numNodes) / max(graph.numNodes, 1)
+        self.positions = np.column_stack([np.cos(angles), np.sin(angles)])
+        self.edgeColors = np.tile(to_rgba(GraphRenderer.EDGE_COLOR), (graph.numEdges, 1))
+        self.attackEdgeColor = to_rgba(GraphRenderer.ATTACK_EDGE_COLOR)
+        self.edgeWidths = np.zeros(graph.numEdges)
+
+        plt.ion()
+        self.figure, self.axes = plt.subplots()
+        self.axes.set_axis_off()
+        self.axes.set_aspect('equal')
+        segments = np.stack([self.positions[graph.edgeSources], self.positions[graph.edgeSinks]], axis= 1)
+        self.edges = self.axes.add_collection(LineCollection(segments, colors= self.edgeColors, zorder= 1))
+        self.nodes = self.axes.scatter(self.positions[:, 0], self.positions[:, 1], marker= GraphRenderer.NOT_INFECTED_MARKER, zorder= 2)
+        self.infectedNodes = self.axes.scatter(self.positions[:, 0], self.positions[:, 1], marker= GraphRenderer.INFECTED_MARKER, zorder= 3)
+        if graph.numNodes <= GraphRenderer.MAX_LABELED_NODES:
+            for (x, y), name in zip(self.positions.tolist(), graph.nodeNames):
+                self.axes.text(x, y, name, fontsize= 8, ha= 'center', va= 'center', zorder= 4)
+        self.axes.set_xlim(-1.1, 1.1)
+        self.axes.set_ylim(-1.1, 1.1)
+
+    def draw(self, nodeLabels, infected, title, attackEdge= None):
+        """Updates the artists to the current game state and shows the frame, the arguments are the same as for update"""
+        self.update(nodeLabels, infected, title, attackEdge= attackEdge)
+        self.showFrame()
+
+    def update(self, nodeLabels, infected, title, attackEdge= None):
+        """Updates the artists to the current game state without showing them, used when frames are saved instead of shown
+        Parameters
+        ----------
+        nodeLabels
+            numpy integer array with the label code of every node, indexing labelColors
+
+        infected
+            numpy boolean array flagging the infected nodes
+
+        title
+            String title shown above the graph
+
+        attackEdge
+            Tuple (origin, destination) of the edge highlighted as this round's attack, None to highlight nothing
+
+        Returns
+        -------
+        None
+        """
+        nodeColors = self.labelRgba[nodeLabels]
+        self.nodes.set_facecolors(nodeColors)
+        self.nodes.set_sizes(np.where(infected, 1, GraphRenderer.NODE_SIZE))
+        self.infectedNodes.set_facecolors(nodeColors)
+        self.infectedNodes.set_sizes(np.where(infected, GraphRenderer.INFECTED_NODE_SIZE, 0))
+
+        self.edgeWidths[:] = self.graph.alive                # Removed edges are drawn with a width of 0
+        colors = self.edgeColors
+        attackEdgeId = self.graph.edgeIds.get(attackEdge) if attackEdge is not None else None
+        if attackEdgeId is not None:
+            colors = colors.copy()
+            colors[attackEdgeId] = self.attackEdgeColor
+            self.edgeWidths[attackEdgeId] = GraphRenderer.ATTACK_EDGE_WIDTH
+        self.edges.set_color(colors)
+        self.edges.set_linewidths(self.edgeWidths)
+        self.axes.set_title(title)
+
+    def showFrame(self):
+        """Redraws the figure, pausing only as long as needed to stay under the frame rate cap"""
+        self.figure.canvas.draw_idle()
+        wait = self.frameInterval - (time.perf_counter() - self.lastFrame) if self.lastFrame is not None else 0
+        self.plt.pause(max(wait, GraphRenderer.MIN_PAUSE))
+        self.lastFrame = time.perf_counter()
+
+if __name__ == "__main__":
+    from SimulationGraph import SimulationGraph
+    graph = SimulationGraph(['a', 'b', 'c', 'd'], [0, 1, 2, 3, 0], [1, 2, 3, 0, 2])
+    renderer = GraphRenderer(graph, ['blue', 'yellow', 'orange', 'red'], maxFps= 2)
+    infected = np.array([True, False, False, False])
+    renderer.draw(np.array([0, 1, 2, 3]), infected, 'Pre Round Setup : Attacking b', attackEdge= (0, 1))
+    graph.removeEdge(0, 2)
+    infected[1] = True
+    renderer.draw(np.array([0, 0, 2, 3]), infected, 'Post Round Results : Attack Successful')
+    renderer.figure.savefig('../local_logs/graph_renderer_test.png')
@@ -0,0 +1,117 @@
+# Python libraries
+import numpy as np
+
+class InfectionFrontier():
+    """
+        Incremental index of the boundary between the infected and non-infected parts of the network.
+
+        For every non-infected node the frontier remembers which infected nodes still have a live edge
+        into it, in the order those nodes were infected. The index is only touched when a node is infected
+        or an edge is quarantined, so asking whether a node is reachable or who can attack it never rescans
+        the infected set.
+
+        The frontier also owns the attacker's observation vector, laid out as the traffic flow, reachable
+        flag and infection score of every node. The reachable flags and infection scores are views into it
+        and every infection or removed edge only updates the entries of the nodes it touches.
+    """
+
+    ### Method functions
+
+    def __init__(self, graph, numNodes):
+        """Class constructor
+        Parameters
+        ----------
+        graph
+            SimulationGraph of the network whose nodes are the integers 0 to numNodes - 1
+
+        numNodes
+            Integer number of nodes in the network
+
+        Returns
+        -------
+        None
+        """
+        self.graph = graph
+        self.infectedNodes = []                                          # Infected node ids in the order they were infected
+        self.infected = np.zeros(numNodes, dtype= bool)
+        self.observation = np.zeros(numNodes * 3, dtype= np.float32)     # Traffic flow, reachable flags and infection scores of every node
+        self.trafficFlow = self.observation[:numNodes]
+        self.reachable = self.observation[numNodes : numNodes * 2]       # 1 for every node the infected network can currently attack
+        self.infectionScores = self.observation[numNodes * 2:]           # 1 plus the live edges to non-infected nodes, 0 once infected
+        self.infectionScores[:] = graph.liveOutDegrees + 1
+        self.attackers = [{} for _ in range(numNodes)]                   # Insertion ordered dicts of infected nodes with a live edge into each node
+        self.numReachable = 0
+
+    def infectNode(self, node):
+        """Marks a node as infected and opens up its out going edges as new attack paths
+        Parameters
+        ----------
+        node
+            Integer id of the newly infected node
+
+        Returns
+        -------
+        None
+        """
+        if self.infected[node]: return
+        self.infected[node] = True
+        self.infectedNodes.append(node)
+        self.attackers[node].clear()
+        self.setReachable(node, False)
+        self.infectionScores[node] = 0
+        for neighbor in self.graph.inNeighbors(node).tolist():
+            if not self.infected[neighbor]: self.infectionScores[neighbor] -= 1
+        for neighbor in self.graph.neighbors(node).tolist():
+            if not self.infected[neighbor]:
+                self.attackers[neighbor][node] = None
+                self.setReachable(neighbor, True)
+
+    def removeEdge(self, origin, destination):
+        """Closes the attack path along an edge that was removed from the network
+        Parameters
+        ----------
+        origin
+            Integer id of the node the edge leaves from
+
+        destination
+            Integer id of the node the edge points to
+
+        Returns
+        -------
+        None
+        """
+        if not self.infected[origin] and not self.infected[destination]: self.infectionScores[origin] -= 1
+        attackers = self.attackers[destination]
+        if origin in attackers:
+            del attackers[origin]
+            if not attackers: self.setReachable(destination, False)
+
+    def setReachable(self, node, reachable):
+        """Updates the reachable flag of a node while keeping the reachable count in sync"""
+        if self.reachable[node] != reachable:
+            self.reachable[node] = reachable
+            self.numReachable += 1 if reachable else -1
+
+    def isReachable(self, node):
+        """Returns true if the infected network has a live edge into this non-infected node"""
+        return bool(self.reachable[node])
+
+    def isInfected(self, node):
+        """Returns true if the node has been infected"""
+        return bool(self.infected[node])
+
+    def findAttacker(self, node):
+        """Returns the earliest infected node with a live edge into the node, None if it is not reachable"""
+        return next(iter(self.attackers[node]), None)
+
+if __name__ == "__main__":
+    from SimulationGraph import SimulationGraph
+    graph = SimulationGraph(['a', 'b', 'c'], [0, 1, 2, 0], [1, 2, 0, 2])
+    frontier = InfectionFrontier(graph, 3)
+    frontier.infectNode(0)
+    print(frontier.reachable, frontier.findAttacker(2))
+    graph.removeEdge(0, 2)
+    frontier.removeEdge(0, 2)
+    print(frontier.reachable, frontier.findAttacker(2))
+    frontier.infectNode(1)
+    print(frontier.reachable, frontier.findAttacker(2), frontier.infectedNodes, frontier.infectionScores)
@@ -1,4 +1,10 @@
+# Python libraries
+import numpy as np
+
 class Message():
+    """Lightweight view of one message stored inside a MessageBatch"""
+
+    __slots__ = ('batch', 'index')
 
     ### Static class Variables
 
@@ -14,69 +20,200 @@ class Message():
     TOTBYTES_INDEX = 12
     SRCBYTES_INDEX = 13
     DUR_INDEX = 1
+
+    # Metadata columns fed into the networks, in the order asNetworkInputs returns them
+    NETWORK_INPUT_INDICES = [DUR_INDEX, SRCBYTES_INDEX, TOTBYTES_INDEX, TOTPKTS_INDEX]
     ### Member functions
 
-    def __init__(self, args):
+    def __init__(self, args= None, batch= None, index= 0):
         """Class constructor
         Parameters
         ----------
         args
-            An array containing message metadata organized as follows:
-            
+            An array containing message metadata organized as follows, only used when no batch is given:
+
             origin
-                String with the IP address of the originating node
+                Integer id of the originating node
 
             destination
-                String with the IP address of the destination node
+                Integer id of the destination node
 
             label
                 String representing whether the message is malicious or benign
-            
+
+        batch
+            MessageBatch holding the message metadata this message is a view of
+
+        index
+            Integer position of the message inside the batch
+
         Returns
         -------
         None
         """
-        self.origin = args[Message.ORIGIN_INDEX]
-        self.destination = args[Message.DESTINATION_INDEX]
-        self.label = args[Message.LABEL_INDEX].strip()
-        self.totpkts = args[Message.TOTPKTS_INDEX]
-        self.totbytes = args[Message.TOTBYTES_INDEX]
-        self.srcbytes = args[Message.SRCBYTES_INDEX]
-        self.dur = args[Message.DUR_INDEX]
-        
+        if batch is None: batch = MessageBatch.fromRows([args])
+        self.batch = batch
+        self.index = index
+
+    @classmethod
+    def fromFields(cls, origin, destination, label, totpkts, totbytes, srcbytes, dur):
+        """Builds a message directly from its metadata fields instead of a full dataset row
+        Parameters
+        ----------
+        origin
+            Node id of the originating node
+
+        destination
+            Node id of the destination node
+
+        label
+            String representing whether the message is malicious or benign
+
+        totpkts, totbytes, srcbytes, dur
+            Numeric traffic features of the captured message
+
+        Returns
+        -------
+        message
+            Message object holding the given metadata
+        """
+        batch = MessageBatch([origin], [destination], [[dur, srcbytes, totbytes, totpkts]], [label == Message.MALICIOUS_LABEL])
+        return cls(batch= batch)
+
+    @property
+    def origin(self):
+        return int(self.batch.origins[self.index])
+
+    @property
+    def destination(self):
+        return int(self.batch.destinations[self.index])
+
+    @property
+    def label(self):
+        return Message.MALICIOUS_LABEL if self.batch.malicious[self.index] else Message.BENIGN_LABEL
+
+    @property
+    def dur(self):
+        return self.batch.features[self.index, 0]
+
+    @property
+    def srcbytes(self):
+        return self.batch.features[self.index, 1]
+
+    @property
+    def totbytes(self):
+        return self.batch.features[self.index, 2]
+
+    @property
+    def totpkts(self):
+        return self.batch.features[self.index, 3]
+
     def isMalicious(self):
         """Returns a boolean flag stating whether the message is malicious"""
-        return self.label == Message.MALICIOUS_LABEL
+        return bool(self.batch.malicious[self.index])
 
     def asNetworkInputs(self):
         """Returns the message metadata as an array to be fed into networks
         Parameters
         ----------
         None
-        
+
         Returns
         -------
-        Metadata array containing these elements:
-            origin
-                String with the IP address of the originating node
-            
-            destination
-                String with the IP address of the destination node
+        Metadata array view into the batch containing these elements:
+            dur, srcbytes, totbytes, totpkts
 
         """
-        #return [self.origin, self.destination]
-        return [self.dur, self.srcbytes, self.totbytes, self.totpkts]
+        return self.batch.features[self.index]
 
     def __str__(self):
         """Returns a string of the message metadata when an attempt to turn a message object into a string occurs"""
-        args = self.asNetworkInputs()
-        args = [self.origin, self.destination, self.label] + args
+        args = [self.origin, self.destination, self.label] + self.asNetworkInputs().tolist()
         args = [str(arg) for arg in args]
         string = ','.join(args)
         return string
 
-if __name__ == "__main__": 
-    args = ['','','800', "127.0.0.0.1", '', '', '196.62.0.1', '', '', '', '', '1','10','100', Message.MALICIOUS_LABEL]
+class MessageBatch():
+    """
+        Structure of arrays storage for a set of messages, such as one round of network traffic.
+
+        Node ids, network input features and malicious flags are each held in a single numpy array,
+        so a whole round costs a handful of allocations and its feature matrix can be handed to a model as is.
+        Indexing a batch returns a Message view of one row.
+    """
+
+    __slots__ = ('origins', 'destinations', 'features', 'malicious')
+
+    ### Class functions
+
+    @classmethod
+    def fromRows(cls, rows):
+        """Builds a batch from full metadata rows laid out as described by the Message index variables
+        Parameters
+        ----------
+        rows
+            List of metadata rows, with node ids in the origin and destination columns
+
+        Returns
+        -------
+        batch
+            MessageBatch holding every row
+        """
+        origins = [row[Message.ORIGIN_INDEX] for row in rows]
+        destinations = [row[Message.DESTINATION_INDEX] for row in rows]
+        features = [[row[index] for index in Message.NETWORK_INPUT_INDICES] for row in rows]
+        malicious = [str(row[Message.LABEL_INDEX]).strip() == Message.MALICIOUS_LABEL for row in rows]
+        return cls(origins, destinations, features, malicious)
+
+    @classmethod
+    def concatenate(cls, batches):
+        """Joins several batches into one, keeping their order"""
+        return cls(np.concatenate([batch.origins for batch in batches]),
+                   np.concatenate([batch.destinations for batch in batches]),
+                   np.concatenate([batch.features for batch in batches]),
+                   np.concatenate([batch.malicious for batch in batches]))
+
+    ### Member functions
+
+    def __init__(self, origins, destinations, features, malicious):
+        """Class constructor
+        Parameters
+        ----------
+        origins
+            Array of the integer ids of the node sending each message
+
+        destinations
+            Array of the integer ids of the node receiving each message
+
+        features
+            2D array with the network inputs of each message as rows
+
+        malicious
+            Array of booleans flagging the malicious messages
+
+        Returns
+        -------
+        None
+        """
+        self.origins = np.asarray(origins, dtype= np.int32)
+        self.destinations = np.asarray(destinations, dtype= np.int32)
+        self.features = np.asarray(features, dtype= np.float32).reshape(len(self.origins), len(Message.NETWORK_INPUT_INDICES))
+        self.malicious = np.asarray(malicious, dtype= bool)
+
+    def __len__(self):
+        """Returns the number of messages in the batch"""
+        return len(self.origins)
+
+    def __getitem__(self, index):
+        """Returns a Message view of one row of the batch"""
+        return Message(batch= self, index= index)
+
+    def __iter__(self):
+        """Iterates over Message views of every row of the batch"""
+        return (Message(batch= self, index= index) for index in range(len(self)))
+
+if __name__ == "__main__":
+    args = ['','800','', 0, '', '', 1, '', '', '', '', '1','10','100', Message.MALICIOUS_LABEL]
     message = Message(args)
     print(message.origin)
     print(message.destination)
@@ -84,3 +221,6 @@ if __name__ == "__main__":
     print(message.isMalicious())
     print(message.asNetworkInputs())
     print(message)
+    batch = MessageBatch.concatenate([message.batch, Message.fromFields(1, 2, Message.BENIGN_LABEL, 2, 20, 10, 0.5).batch])
+    print(batch.features)
+    print([str(message) for message in batch])
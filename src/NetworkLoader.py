@@ -0,0 +1,105 @@
+# Python libraries
+import hashlib
+import os
+import numpy as np
+
+class NetworkLoader():
+    """
+        Loads network edge list files through a compact binary cache.
+
+        The first time a network file is read its edge list is parsed into int32 source and sink id arrays
+        plus the table of node IPs, and saved as an npz file under the cache directory. The cache entry is keyed
+        by the file path, modification time and size, so editing a network rebuilds it, and every later load,
+        in this or any other process, skips the csv entirely. Loaded networks are also kept in memory so each
+        new game of a process only rebuilds its graph from the arrays.
+    """
+
+    ### Static Class Variables
+    CACHE_DIR_PATH = '../local_cache'                         # Default path to the dir where the binary network caches are saved
+    CACHE_FILE_NAME = '{0}_{1}.npz'                           # Cache files are named after the network file and a hash of its path, mtime and size
+
+    # Indicies for the network file
+    NETWORK_SOURCE_IP_INDEX = 0
+    NETWORK_SINK_IP_INDEX = 1
+
+    loadedNetworks = {}                                       # In memory cache of every network loaded by this process, keyed like the cache files
+
+    ### Class functions
+
+    @classmethod
+    def load(cls, networkPath):
+        """Returns the parsed edge list of a network file, from memory or the binary cache when possible
+        Parameters
+        ----------
+        networkPath
+            String representing the file path to the network parameters file
+
+        Returns
+        -------
+        nodeNames
+            numpy array of the node IPs, indexed by node id in order of first appearance in the file
+
+        sources
+            int32 numpy array of the node id each edge leaves from
+
+        sinks
+            int32 numpy array of the node id each edge points to
+        """
+        fileStats = os.stat(networkPath)
+        cacheKey = '{0}|{1}|{2}'.format(os.path.abspath(networkPath), fileStats.st_mtime_ns, fileStats.st_size)
+        if cacheKey in cls.loadedNetworks: return cls.loadedNetworks[cacheKey]
+
+        networkName = os.path.splitext(os.path.basename(networkPath))[0]
+        cachePath = os.path.join(cls.CACHE_DIR_PATH, cls.CACHE_FILE_NAME.format(networkName, hashlib.sha1(cacheKey.encode()).hexdigest()[:16]))
+        if os.path.exists(cachePath):
+            with np.load(cachePath) as cache:
+                network = (cache['nodeNames'], cache['sources'], cache['sinks'])
+        else:
+            network = cls.parse(networkPath)
+            cls.saveCache(cachePath, network)
+
+        cls.loadedNetworks[cacheKey] = network
+        return network
+
+    @classmethod
+    def parse(cls, networkPath):
+        """Reads a csv edge list, giving every node an integer id in order of first appearance
+        Parameters
+        ----------
+        networkPath
+            String representing the file path to the network parameters file
+
+        Returns
+        -------
+        Same as load
+        """
+        nodeIds = {}
+        sources = []
+        sinks = []
+        with open(networkPath, 'r') as file:
+            lines = file.readlines()[1:]
+            for line in lines:
+                elems = line.split(',')
+                for nodeIP, edgeEnds in ((elems[cls.NETWORK_SOURCE_IP_INDEX].strip(), sources), (elems[cls.NETWORK_SINK_IP_INDEX].strip(), sinks)):
+                    if nodeIP not in nodeIds: nodeIds[nodeIP] = len(nodeIds)
+                    edgeEnds.append(nodeIds[nodeIP])
+
+        nodeNames = np.array(list(nodeIds), dtype= str)
+        return nodeNames, np.array(sources, dtype= np.int32), np.array(sinks, dtype= np.int32)
+
+    @classmethod
+    def saveCache(cls, cachePath, network):
+        """Writes a parsed network to its cache file, silently skipping the cache if the directory is not writable"""
+        nodeNames, sources, sinks = network
+        temporaryPath = '{0}.{1}.tmp'.format(cachePath, os.getpid())
+        try:
+            with open(temporaryPath, 'wb') as file:
+                np.savez(file, nodeNames= nodeNames, sources= sources, sinks= sinks)
+            os.replace(temporaryPath, cachePath)    # Other processes only ever see a complete cache file
+        except OSError:
+            pass
+
+if __name__ == "__main__":
+    nodeNames, sources, sinks = NetworkLoader.load("../networks/sf_20.csv")
+    print(len(nodeNames), len(sources), nodeNames[:5], sources[:5], sinks[:5])
+    print(NetworkLoader.load("../networks/sf_20.csv")[0] is nodeNames)
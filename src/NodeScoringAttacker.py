@@ -0,0 +1,144 @@
+# Pyhton Libraries
+import numpy as np
+
+# User defined libraries
+from Attacker import *
+
+class NodeScoringAttacker(Attacker):
+    """
+        Attacker whose model scores one node at a time instead of the whole network at once.
+
+        Every reachable node is described by its own traffic flow, reachable flag and infection score, and the
+        same small network scores each of them, with one extra row standing for passing the round. A round is
+        one batched model call over the candidate rows only, so the model size does not depend on the network
+        and its cost grows with the infection frontier. The same trained weights can play on any network.
+    """
+
+    ### Static class variables
+    NODE_FEATURE_SIZE = 4                                     # Traffic flow, reachable flag, infection score and a flag marking the pass row
+    HIDDEN_LAYER_SIZE = 32
+    PASS_FEATURES = [0, 0, 0, 1]
+
+    def getMemoryShape(self):
+        """Remembers the features of the one row that was picked, with a single score per decision"""
+        return NodeScoringAttacker.NODE_FEATURE_SIZE, 1
+
+    def initializeModel(self):
+        """Initializes the model of the agent
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        tf, Sequential, Dense, Adam = importBackend()
+        model = Sequential()
+        model.add(Dense(NodeScoringAttacker.HIDDEN_LAYER_SIZE, input_dim= NodeScoringAttacker.NODE_FEATURE_SIZE, activation='relu'))
+        model.add(Dense(NodeScoringAttacker.HIDDEN_LAYER_SIZE, activation='relu'))
+        model.add(Dense(1, activation='linear'))
+        model.compile(loss= tf.keras.losses.Huber(), optimizer=Adam(lr=Agent.DEFAULT_LEARNING_RATE))
+        self.model = model
+
+    def buildCandidateRows(self, observation):
+        """Builds the model rows of one game state
+        Parameters
+        ----------
+        observation
+            [trafficFlow, reachableNodes, infectionScores] laid out as in getAttack
+
+        Returns
+        -------
+        candidates
+            numpy array of the reachable node ids followed by the pass index, one per row
+
+        rows
+            2D float32 numpy array with the features of each candidate
+        """
+        trafficFlow, reachableNodes, infectionScores = (np.asarray(part, dtype= np.float32) for part in observation)
+        nodes = np.flatnonzero(reachableNodes)
+        rows = np.zeros((len(nodes) + 1, NodeScoringAttacker.NODE_FEATURE_SIZE), dtype= np.float32)
+        rows[:-1, 0] = trafficFlow[nodes]
+        rows[:-1, 1] = 1
+        rows[:-1, 2] = infectionScores[nodes]
+        rows[-1] = NodeScoringAttacker.PASS_FEATURES
+        return np.append(nodes, self.OUTPUT_SIZE - 1), rows
+
+    def chooseAttacks(self, observations):
+        """Picks the node to attack for a whole set of game states, scoring the candidates of every non random pick in a single model call
+        Parameters
+        ----------
+        observations
+            List of [trafficFlow, reachableNodes, infectionScores] entries, one per game state, laid out as in getAttack
+
+        Returns
+        -------
+        destinationIndices
+            List with the index of the node to attack for each game state, one greater than the last node for a "bye"
+        """
+        candidateSets = [self.buildCandidateRows(observation) for observation in observations]
+        destinationIndices = [candidates[np.random.randint(len(candidates))] for candidates, _ in candidateSets]
+        modelPicks = np.flatnonzero(np.random.random(len(observations)) >= self.epsilon)
+        if len(modelPicks) > 0:
+            rows = np.concatenate([candidateSets[pick][1] for pick in modelPicks])
+            scores = self.model.predict(rows, verbose= 0)[:, 0]
+            firstRow = 0
+            for pick in modelPicks:
+                candidates = candidateSets[pick][0]
+                destinationIndices[pick] = candidates[np.argmax(scores[firstRow : firstRow + len(candidates)])]
+                firstRow += len(candidates)
+        return [int(index) for index in destinationIndices]
+
+    def train(self):
+        """Replays a sample of the remembered picks in one batched pass, fitting the score of each picked row to its reward
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        self.lossHistory.losses_clear()
+        if len(self.memory) > 0:
+            indices, nodeFeatures, picks, rewards, _, weights = self.sampleMemory()
+            if indices is not None: self.updatePriorities(indices, self.model.predict(nodeFeatures, verbose= 0), picks, rewards)
+            self.fitBatch(nodeFeatures, np.reshape(rewards, (-1, 1)), sampleWeights= weights)
+
+        if self.epsilon > Agent.EPSILON_MIN: self.epsilon *= Agent.DEFAULT_EPSILON_DECAY
+
+    def addTrainingPoint(self, attackerInputs, attackIndex, reward):
+        """Adds the features of the picked node and the reward it earned to the agents memory
+        Parameters
+        ----------
+        attackerInputs
+            An array containing the traffic flow, reachable flag and infection score of every node, as given to the full network Attacker
+
+        attackIndex
+            The index in the list of nodes of the graph that were attacked this round, one greater than the last node for a "bye"
+
+        reward
+            the integer reward for the current state action sequence
+
+        Returns
+        -------
+        None
+        """
+        self.score += reward
+        if attackIndex == self.OUTPUT_SIZE - 1:
+            nodeFeatures = NodeScoringAttacker.PASS_FEATURES
+        else:
+            nodeFeatures = [attackerInputs[self.TRAFFIC_FLOW_INDEX + attackIndex], attackerInputs[self.REACHABLE_NODES_INDEX + attackIndex],
+                            attackerInputs[self.INFECTION_SCORES_INDEX + attackIndex], 0]
+        self.memory.add(nodeFeatures, 0, reward, True)
+
+if __name__ == "__main__":
+    attacker = NodeScoringAttacker("../datasets/defaultAttackDataset.csv", 4, epsilon= 0)
+    observation = [(3, 0, 1, 2), (0, 1, 0, 1), (0, 2, 0, 5)]
+    print(attacker.buildCandidateRows(observation))
+    print(attacker.chooseAttacks([observation, [(0, 0, 0, 0), (0, 0, 0, 0), (0, 0, 0, 0)]]))
+    attacker.addTrainingPoint(observation[0] + observation[1] + observation[2], 3, 5)
+    attacker.addTrainingPoint(observation[0] + observation[1] + observation[2], 4, 0)
+    attacker.train()
+    print(attacker.memory.observations[:2], attacker.lossHistory.losses)
@@ -0,0 +1,143 @@
+# Python libraries
+import multiprocessing
+import random
+import numpy as np
+
+# User defined libraries
+from GameEngine import GameEngine
+from SharedStore import SharedStore
+
+# Game engine owned by each worker process, built once by initializeWorker
+workerEngine = None
+
+def initializeWorker(engineArguments, storeManifest):
+    """Builds the headless game engine a worker process plays all of its episodes with
+    Parameters
+    ----------
+    engineArguments
+        Dictionary of keyword arguments for the GameEngine constructor
+
+    storeManifest
+        Dictionary returned by SharedStore.publish, the worker maps the main process's datasets and network from it instead of parsing them
+
+    Returns
+    -------
+    None
+    """
+    global workerEngine
+    SharedStore.attach(storeManifest)
+    workerEngine = GameEngine(**engineArguments)
+
+def playEpisode(episodeSettings):
+    """Plays one seeded episode in a worker process with the latest weights from the main process
+    Parameters
+    ----------
+    episodeSettings
+        Dictionary holding the episode number and seed, and the weights and epsilon of both players
+
+    Returns
+    -------
+    episodeResults
+        Dictionary holding the game log row and the replay memory arrays of both players for the main process to train on
+    """
+    random.seed(episodeSettings['seed'])
+    np.random.seed(episodeSettings['seed'])
+    workerEngine.initializeGame()
+    for player, name in ((workerEngine.attacker, 'attacker'), (workerEngine.defender, 'defender')):
+        player.setWeights(episodeSettings[name + 'Weights'])
+        player.epsilon = episodeSettings[name + 'Epsilon']
+        player.memory.clear()                                             # Workers only send back the decisions of this episode
+
+    workerEngine.runGame()
+    workerEngine.saveRecording(episodeSettings['episode'])                # Recordings are written by the worker that played the game
+    return {'gameResults' : workerEngine.getGameResults(),
+            'attackerMemory' : workerEngine.attacker.memory.arrays(),
+            'defenderMemory' : workerEngine.defender.memory.arrays()}
+
+class ParallelGameRunner():
+    """
+        Plays episodes in a pool of worker processes while the main process owns and trains the models.
+
+        Each worker keeps its own headless GameEngine and plays one seeded episode at a time with the weights
+        it is sent. The finished games come back to the main process in episode order, where they are logged
+        and, when training, replayed into the main players before the new weights go out with the next episodes.
+        The datasets and network the main engine loaded reach the workers through a SharedStore.
+    """
+
+    ### Method functions
+
+    def __init__(self, engine, numWorkers, seed= None):
+        """Class constructor
+        Parameters
+        ----------
+        engine
+            GameEngine of the main process, its players are the ones trained and saved
+
+        numWorkers
+            Integer number of worker processes playing episodes
+
+        seed
+            Integer seed the episode seeds are counted up from, a random one is picked if None
+
+        Returns
+        -------
+        None
+        """
+        self.engine = engine
+        self.numWorkers = numWorkers
+        self.seed = seed if seed is not None else random.randrange(2 ** 31)
+
+    def getEngineArguments(self):
+        """Returns the constructor arguments of a headless copy of the main game engine for the workers
+           Worker memories get the main players' capacity so an episode keeps as many decisions as a serial run would, but never
+           the replay path, the memory mapped files belong to the main players
+        """
+        return {'trafficPath' : self.engine.trafficPath, 'attackPath' : self.engine.attackPath, 'networkPath' : self.engine.networkPath,
+                'epsilon' : self.engine.startingEpsilon, 'visualize' : False, 'batchSize' : self.engine.batchSize, 'trainingEpochs' : self.engine.trainingEpochs,
+                'attackerType' : self.engine.attackerType, 'recordPath' : self.engine.recordPath,
+                'reservoirSize' : self.engine.reservoirSize, 'replayCapacity' : self.engine.replayCapacity, 'prioritized' : self.engine.prioritized}
+
+    def getEpisodeSettings(self, episode):
+        """Packs the number and seed of an episode together with the current weights and exploration rates of the main players"""
+        return {'seed' : self.seed + episode, 'episode' : episode,
+                'attackerWeights' : self.engine.attacker.model.get_weights(), 'attackerEpsilon' : self.engine.attacker.epsilon,
+                'defenderWeights' : self.engine.defender.model.get_weights(), 'defenderEpsilon' : self.engine.defender.epsilon}
+
+    def run(self, episodes, train= False):
+        """Plays the episodes across the worker pool, one round of numWorkers episodes at a time
+        Parameters
+        ----------
+        episodes
+            Integer number of games to be played
+
+        train
+            Boolean, if set the main players train on every finished game and the workers get their new weights
+
+        Returns
+        -------
+        None
+        """
+        context = multiprocessing.get_context('spawn')  # Forking a process that already loaded tensorflow is not safe
+        store = SharedStore()
+        try:
+            self.runPool(context, store.publish(), episodes, train)
+        finally:
+            store.close()
+
+    def runPool(self, context, storeManifest, episodes, train):
+        """Plays the episodes on a pool of workers that map their datasets and network from the shared store, see run"""
+        with context.Pool(self.numWorkers, initializer= initializeWorker, initargs= (self.getEngineArguments(), storeManifest)) as pool:
+            for firstEpisode in range(0, episodes, self.numWorkers):
+                batchEpisodes = range(firstEpisode, min(firstEpisode + self.numWorkers, episodes))
+                episodeSettings = [self.getEpisodeSettings(episode) for episode in batchEpisodes]
+                for episode, episodeResults in zip(batchEpisodes, pool.imap(playEpisode, episodeSettings)):
+                    print('Episode', episode, 'complete')
+                    if train:
+                        self.engine.attacker.prepareForNextGame()
+                        self.engine.defender.prepareForNextGame()
+                        self.engine.attacker.memory.extend(*episodeResults['attackerMemory'])
+                        self.engine.defender.memory.extend(*episodeResults['defenderMemory'])
+                        self.engine.train()
+                        print('Training for episode', episode, 'complete')
+                    self.engine.logGameResults(episodeResults['gameResults'], episode)
+                    self.engine.logPhaseTimes(episode)
@@ -0,0 +1,80 @@
+# Python libraries
+from collections import OrderedDict
+
+class PredictionCache():
+    """
+        Bounded least recently used cache of model decisions, tied to the version of the model that made them.
+
+        Messages are drawn from a finite pool of dataset rows, so the same feature vectors reach the model over
+        and over. Entries are keyed by the raw bytes of the feature vector. Every lookup passes the current model
+        version and the whole cache is dropped as soon as it changes, so a decision never outlives the weights
+        that produced it.
+    """
+
+    ### Method functions
+
+    def __init__(self, maxEntries):
+        """Class constructor
+        Parameters
+        ----------
+        maxEntries
+            Integer number of decisions kept before the least recently used one is evicted
+
+        Returns
+        -------
+        None
+        """
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, keys, version):
+        """Finds the cached decisions for a set of keys
+        Parameters
+        ----------
+        keys
+            List of hashable keys, such as feature vector bytes
+
+        version
+            Integer version of the model the decisions should come from, a new version empties the cache
+
+        Returns
+        -------
+        values
+            List with the cached decision of each key, None for the keys not in the cache
+        """
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+        values = []
+        for key in keys:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            values.append(value)
+        return values
+
+    def store(self, key, value):
+        """Caches the decision for a key under the current version, evicting the least recently used entry when full"""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxEntries: self.entries.popitem(last= False)
+
+    def hitRate(self):
+        """Returns the fraction of lookups answered from the cache, None before the first lookup"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+if __name__ == "__main__":
+    cache = PredictionCache(2)
+    print(cache.lookup(['a', 'b'], 0))
+    cache.store('a', 1)
+    cache.store('b', 2)
+    print(cache.lookup(['a'], 0))
+    cache.store('c', 3)
+    print(cache.lookup(['a', 'b', 'c'], 0), cache.lookup(['a'], 1), cache.hits, cache.misses, cache.hitRate())
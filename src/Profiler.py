@@ -0,0 +1,112 @@
+# Python libraries
+import os
+import time
+
+class PhaseTimer():
+    """
+        Accumulates the wall clock time spent in each phase of a game.
+
+        Phases are timed with a monotonic counter between tic and toc calls, and the call count and total
+        seconds of each phase are summed until the episode is written out with logEpisode. Phases may nest,
+        generateTrafficQueues for example includes the backgroundTraffic and getAttack phases.
+    """
+
+    ### Static Class Variables
+    PHASE_LOG_HEADERS = 'Network,Episode,Phase,Calls,Total Seconds,Mean Ms\n'
+    PHASE_ROW_STRING  = '{0},{1},{2},{3},{4:.6f},{5:.4f}\n'
+
+    ### Method functions
+
+    def __init__(self, logPath):
+        """Class constructor
+        Parameters
+        ----------
+        logPath
+            String file path of the csv the per episode phase times are appended to
+
+        Returns
+        -------
+        None
+        """
+        self.logPath = logPath
+        self.phases = {}                                                 # Maps each phase name to [calls, total seconds]
+
+    def tic(self):
+        """Returns the current monotonic time to be handed back to toc when the phase ends"""
+        return time.perf_counter()
+
+    def toc(self, phase, startTime):
+        """Adds the time since startTime to the running total of a phase"""
+        elapsed = time.perf_counter() - startTime
+        totals = self.phases.get(phase)
+        if totals is None: totals = self.phases[phase] = [0, 0.0]
+        totals[0] += 1
+        totals[1] += elapsed
+
+    def logEpisode(self, networkName, episode):
+        """Appends one row per phase with the totals of the episode to the phase log and starts counting from zero
+        Parameters
+        ----------
+        networkName
+            String name of the network the episode was played on
+
+        episode
+            Integer number of the episode
+
+        Returns
+        -------
+        None
+        """
+        newFile = not os.path.exists(self.logPath)
+        with open(self.logPath, 'a+') as file:
+            if newFile: file.write(PhaseTimer.PHASE_LOG_HEADERS)
+            for phase, (calls, seconds) in self.phases.items():
+                file.write(PhaseTimer.PHASE_ROW_STRING.format(networkName, episode, phase, calls, seconds, 1000 * seconds / calls))
+        self.phases = {}
+
+class NullTimer():
+    """Stand in for PhaseTimer when profiling is turned off, every call does nothing"""
+
+    def tic(self):
+        return 0
+
+    def toc(self, phase, startTime):
+        pass
+
+    def logEpisode(self, networkName, episode):
+        pass
+
+def profileCall(function, statsPath, numRows= 25):
+    """Runs a function under cProfile, saves the stats and prints the functions with the highest cumulative time
+    Parameters
+    ----------
+    function
+        Function taking no arguments to be profiled
+
+    statsPath
+        String file path the profile stats are dumped to, they can be loaded with pstats or snakeviz
+
+    numRows
+        Integer number of functions printed
+
+    Returns
+    -------
+    result
+        The return value of the function
+    """
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function)
+    profiler.dump_stats(statsPath)
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(numRows)
+    return result
+
+if __name__ == "__main__":
+    timer = PhaseTimer('/dev/null')
+    for _ in range(3):
+        start = timer.tic()
+        time.sleep(0.01)
+        timer.toc('sleep', start)
+    print(timer.phases)
+    profileCall(lambda: sum(range(100000)), os.devnull, numRows= 5)
@@ -0,0 +1,261 @@
+# Python libraries
+import json
+import os
+import numpy as np
+
+# User defined libraries
+from SumTree import SumTree
+
+class ReplayMemory():
+    """
+        Fixed size ring buffer of the transitions an agent remembers between training runs.
+
+        Observations, actions, rewards and valid action masks are each kept in one preallocated numpy array,
+        so memory use is set by the capacity alone. Once full the oldest transitions are overwritten. When a
+        path is given the arrays are memory mapped .npy files in that directory, with a small JSON header
+        recording how much of them is filled, so the memory can outgrow RAM and is picked up again by the next
+        process. Samples are copies gathered by index rather than slices of the arrays: rows drawn at random
+        from anywhere in the ring buffer are not contiguous, and a contiguous window would train on consecutive,
+        correlated decisions. The copy is the size of one training batch, not of the memory.
+
+        In prioritized mode a SumTree holds a priority per slot, new transitions get the highest priority seen so
+        far and samples are drawn in proportion to priority, together with the importance sampling weights that
+        undo the bias this puts on training.
+    """
+
+    ### Static Class Variables
+    HEADER_FILE_NAME = 'header.json'
+    ARRAY_FILE_NAME = '{0}.npy'
+
+    # Prioritized replay settings
+    PRIORITY_ALPHA = 0.6                                              # How strongly priorities skew sampling, 0 is uniform
+    PRIORITY_EPSILON = 0.01                                           # Added to every error so no transition stops being replayed
+    PRIORITY_BETA = 0.4                                               # Starting strength of the importance sampling correction
+    PRIORITY_BETA_INCREMENT = 0.001                                   # Amount beta grows per prioritized sample until it reaches 1
+
+    ### Method functions
+
+    def __init__(self, observationSize, maskSize, capacity, path= None, prioritized= False):
+        """Class constructor
+        Parameters
+        ----------
+        observationSize
+            Integer length of each observation
+
+        maskSize
+            Integer number of actions, each transition stores which of them were valid
+
+        capacity
+            Integer maximum number of transitions held before the oldest are overwritten
+
+        path
+            String path to a directory to memory map the arrays in, kept in RAM if None.
+            A memory saved there with the same sizes is reopened instead of starting empty
+
+        prioritized
+            Boolean, if set transitions are sampled in proportion to their priority instead of uniformly
+
+        Returns
+        -------
+        None
+        """
+        self.observationSize = observationSize
+        self.maskSize = maskSize
+        self.capacity = capacity
+        self.path = path
+        self.size = 0                                                     # Number of filled slots
+        self.position = 0                                                 # Slot the next transition is written to
+        self.priorities = SumTree(capacity) if prioritized else None
+        self.beta = ReplayMemory.PRIORITY_BETA
+
+        shapes = {'observations' : ((capacity, observationSize), np.float32), 'actions' : ((capacity,), np.int32),
+                  'rewards' : ((capacity,), np.float32), 'masks' : ((capacity, maskSize), bool)}
+        if path is None:
+            for name, (shape, dtype) in shapes.items():
+                setattr(self, name, np.zeros(shape, dtype= dtype))
+            return
+
+        os.makedirs(path, exist_ok= True)
+        header = self.readHeader()
+        mode = 'r+' if header is not None else 'w+'
+        for name, (shape, dtype) in shapes.items():
+            setattr(self, name, np.lib.format.open_memmap(os.path.join(path, ReplayMemory.ARRAY_FILE_NAME.format(name)), mode= mode, dtype= dtype, shape= None if header else shape))
+        if header is not None:
+            self.size, self.position = header['size'], header['position']
+            if self.priorities is not None: self.priorities.update(np.arange(self.size), np.ones(self.size))  # Priorities are not saved, reopened transitions start out equal
+        self.flush()
+
+    def readHeader(self):
+        """Returns the header saved in the memory directory, None if there is none or it was saved with different sizes"""
+        try:
+            with open(os.path.join(self.path, ReplayMemory.HEADER_FILE_NAME)) as file:
+                header = json.load(file)
+        except (OSError, ValueError):
+            return None
+        sizes = (header.get('capacity'), header.get('observationSize'), header.get('maskSize'))
+        return header if sizes == (self.capacity, self.observationSize, self.maskSize) else None
+
+    def getHeader(self):
+        """Returns a dictionary of the shape and fill state of the memory, as saved next to the arrays"""
+        return {'capacity' : self.capacity, 'observationSize' : self.observationSize, 'maskSize' : self.maskSize,
+                'size' : self.size, 'position' : self.position}
+
+    def flush(self, header= None):
+        """Writes memory mapped arrays and the header to disk, does nothing for a memory kept in RAM
+        Parameters
+        ----------
+        header
+            Dictionary from getHeader taken when the flush was queued, so a flush run later on another thread saves the fill state it was asked for, the current state if None
+
+        Returns
+        -------
+        None
+        """
+        if self.path is None: return
+        if header is None: header = self.getHeader()
+        for array in (self.observations, self.actions, self.rewards, self.masks):
+            array.flush()
+        headerPath = os.path.join(self.path, ReplayMemory.HEADER_FILE_NAME)
+        with open(headerPath + '.tmp', 'w') as file:
+            json.dump(header, file)
+        os.replace(headerPath + '.tmp', headerPath)
+
+    def __len__(self):
+        """Returns the number of transitions held"""
+        return self.size
+
+    def clear(self):
+        """Forgets every transition, the arrays are kept and overwritten by the next ones"""
+        self.size = 0
+        self.position = 0
+        if self.priorities is not None: self.priorities = SumTree(self.capacity)
+
+    def add(self, observation, action, reward, mask):
+        """Stores one transition, overwriting the oldest one when full
+        Parameters
+        ----------
+        observation
+            Array like of observationSize numbers the agent decided on
+
+        action
+            Integer index of the action taken
+
+        reward
+            Number rewarded for the action
+
+        mask
+            Array like of maskSize booleans flagging the valid actions
+
+        Returns
+        -------
+        None
+        """
+        position = self.position
+        self.observations[position] = observation
+        self.actions[position] = action
+        self.rewards[position] = reward
+        self.masks[position] = mask
+        if self.priorities is not None: self.priorities.update([position], [self.priorities.maxPriority])
+        self.position = (position + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, observations, actions, rewards, masks):
+        """Stores a set of transitions given as arrays with one transition per row, such as the output of arrays"""
+        numTransitions = len(actions)
+        if numTransitions > self.capacity:                               # Only the newest transitions would survive anyway
+            observations, actions, rewards, masks = observations[-self.capacity:], actions[-self.capacity:], rewards[-self.capacity:], masks[-self.capacity:]
+            numTransitions = self.capacity
+        written = 0
+        while written < numTransitions:
+            count = min(numTransitions - written, self.capacity - self.position)
+            slots = slice(self.position, self.position + count)
+            rows = slice(written, written + count)
+            self.observations[slots] = observations[rows]
+            self.actions[slots] = actions[rows]
+            self.rewards[slots] = rewards[rows]
+            self.masks[slots] = masks[rows]
+            if self.priorities is not None: self.priorities.update(np.arange(slots.start, slots.stop), np.full(count, self.priorities.maxPriority))
+            self.position = (self.position + count) % self.capacity
+            written += count
+        self.size = min(self.size + numTransitions, self.capacity)
+
+    def sample(self, numSamples):
+        """Draws transitions uniformly at random from anywhere in the memory, as copies
+        Parameters
+        ----------
+        numSamples
+            Integer number of transitions drawn, the whole memory is returned shuffled if it holds no more than that
+
+        Returns
+        -------
+        observations, actions, rewards, masks
+            Arrays with one drawn transition per row
+        """
+        if self.size <= numSamples: indices = np.random.permutation(self.size)
+        else: indices = np.random.randint(0, self.size, size= numSamples)   # Drawn with replacement, a permutation of a huge memory would cost more than the draw
+        return self.observations[indices], self.actions[indices], self.rewards[indices], self.masks[indices]
+
+    def samplePrioritized(self, numSamples):
+        """Draws transitions in proportion to their priority, as copies since the draws are scattered over the memory
+        Parameters
+        ----------
+        numSamples
+            Integer number of transitions drawn, capped at the number held
+
+        Returns
+        -------
+        indices
+            Integer array of the slots drawn, to hand back to updatePriorities
+
+        observations, actions, rewards, masks
+            Arrays with one drawn transition per row
+
+        weights
+            float32 array of the importance sampling weight of each transition, scaled so the largest is 1
+        """
+        numSamples = min(numSamples, self.size)
+        indices = self.priorities.sample(numSamples)
+        probabilities = self.priorities.get(indices) / self.priorities.total()
+        weights = (self.size * probabilities) ** -self.beta
+        weights = (weights / weights.max()).astype(np.float32)
+        self.beta = min(1.0, self.beta + ReplayMemory.PRIORITY_BETA_INCREMENT)
+        return indices, self.observations[indices], self.actions[indices], self.rewards[indices], self.masks[indices], weights
+
+    def updatePriorities(self, indices, errors):
+        """Sets the priority of sampled transitions from how far the model was off on them
+        Parameters
+        ----------
+        indices
+            Integer array of slots returned by samplePrioritized
+
+        errors
+            Array of the temporal difference error of each transition
+
+        Returns
+        -------
+        None
+        """
+        self.priorities.update(indices, (np.abs(errors) + ReplayMemory.PRIORITY_EPSILON) ** ReplayMemory.PRIORITY_ALPHA)
+
+    def arrays(self):
+        """Returns copies of the arrays of every stored transition, for handing them to another process"""
+        return (np.array(self.observations[:self.size]), np.array(self.actions[:self.size]),
+                np.array(self.rewards[:self.size]), np.array(self.masks[:self.size]))
+
+if __name__ == "__main__":
+    import tempfile
+    memory = ReplayMemory(3, 2, capacity= 4)
+    for step in range(6):
+        memory.add([step] * 3, step % 2, step, [True, step % 2 == 0])
+    print(len(memory), memory.position, memory.actions, memory.sample(3)[2])
+    directory = tempfile.mkdtemp()
+    mapped = ReplayMemory(3, 2, capacity= 4, path= directory)
+    mapped.extend(*memory.arrays())
+    mapped.flush()
+    reopened = ReplayMemory(3, 2, capacity= 4, path= directory)
+    print(len(reopened), reopened.rewards, reopened.sample(10)[0])
+    prioritized = ReplayMemory(3, 2, capacity= 4, prioritized= True)
+    prioritized.extend(*memory.arrays())
+    indices, _, _, rewards, _, weights = prioritized.samplePrioritized(4)
+    prioritized.updatePriorities(indices, [0, 0, 0, 10])
+    print(indices, rewards, weights, prioritized.samplePrioritized(4)[0])
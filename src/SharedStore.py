@@ -0,0 +1,100 @@
+# Python libraries
+import os
+import shutil
+import tempfile
+import numpy as np
+
+# User defined libraries
+from NetworkLoader import NetworkLoader
+from TrafficDataset import TrafficDataset
+
+class SharedStore():
+    """
+        Shares the datasets and networks loaded by the main process with worker processes without copying them.
+
+        publish writes the arrays of every dataset and network the main process has loaded to .npy files,
+        under /dev/shm where it exists so they live in shared memory, and returns a small manifest naming
+        them. A worker passes the manifest to attach, which memory maps the files read only and puts them
+        straight into the TrafficDataset and NetworkLoader caches. Every worker then maps the same physical
+        pages, so adding workers does not add copies of the data, and no worker ever parses a csv.
+    """
+
+    ### Static Class Variables
+    SHARED_MEMORY_DIR = '/dev/shm'                            # Memory backed file system on linux, the system temp dir is used where it is missing
+    STORE_PREFIX = 'network_sim_store_'
+    DATASET_ARRAYS = ['features', 'malicious', 'cumulativeWeights']
+    NETWORK_ARRAYS = ['nodeNames', 'sources', 'sinks']
+
+    ### Method functions
+
+    def __init__(self):
+        """Class constructor, creates the empty store directory
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        baseDirectory = SharedStore.SHARED_MEMORY_DIR if os.path.isdir(SharedStore.SHARED_MEMORY_DIR) else None
+        self.directory = tempfile.mkdtemp(prefix= SharedStore.STORE_PREFIX, dir= baseDirectory)
+        self.numArrays = 0
+
+    def saveArray(self, array):
+        """Writes one array to the store, returning its path, or None for a missing array"""
+        if array is None: return None
+        path = os.path.join(self.directory, '{0}.npy'.format(self.numArrays))
+        np.save(path, np.ascontiguousarray(array))
+        self.numArrays += 1
+        return path
+
+    def publish(self):
+        """Writes every dataset and network loaded by this process to the store
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        manifest
+            Dictionary listing the cache key and array paths of each dataset and network, small enough to send to every worker
+        """
+        datasets = [(key, [self.saveArray(getattr(dataset, name)) for name in SharedStore.DATASET_ARRAYS]) for key, dataset in TrafficDataset.loadedDatasets.items()]
+        networks = [(key, [self.saveArray(array) for array in network]) for key, network in NetworkLoader.loadedNetworks.items()]
+        return {'datasets' : datasets, 'networks' : networks}
+
+    @staticmethod
+    def attach(manifest):
+        """Memory maps the arrays listed in a manifest into this process's dataset and network caches
+        Parameters
+        ----------
+        manifest
+            Dictionary returned by publish
+
+        Returns
+        -------
+        None
+        """
+        load = lambda path: np.load(path, mmap_mode= 'r') if path is not None else None
+        for key, paths in manifest['datasets']:
+            TrafficDataset.loadedDatasets[key] = TrafficDataset(*[load(path) for path in paths])
+        for key, paths in manifest['networks']:
+            NetworkLoader.loadedNetworks[key] = tuple(load(path) for path in paths)
+
+    def close(self):
+        """Deletes the store, workers must be done with it"""
+        shutil.rmtree(self.directory, ignore_errors= True)
+
+if __name__ == "__main__":
+    dataset = TrafficDataset.load("../datasets/defaultTrafficDataset.csv")
+    network = NetworkLoader.load("../networks/sf_20.csv")
+    store = SharedStore()
+    manifest = store.publish()
+    TrafficDataset.loadedDatasets.clear()
+    NetworkLoader.loadedNetworks.clear()
+    SharedStore.attach(manifest)
+    attached = TrafficDataset.load("../datasets/defaultTrafficDataset.csv")
+    print(store.directory, type(attached.features), np.array_equal(attached.features, dataset.features))
+    print(np.array_equal(NetworkLoader.load("../networks/sf_20.csv")[1], network[1]))
+    store.close()
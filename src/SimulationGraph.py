@@ -0,0 +1,137 @@
+# Python libraries
+import numpy as np
+
+class SimulationGraph():
+    """
+        Array backed directed graph the game is simulated on.
+
+        Edges are stored in compressed sparse row form, grouped by the node they leave from, with a second
+        index grouping them by the node they point to. Quarantining an edge only flips its entry in the alive
+        mask, and resetting the network for the next game refills the mask, so the graph is built once per
+        network instead of once per game. networkx is only used to hand the live graph to code that needs it,
+        such as the game log statistics and drawing.
+    """
+
+    ### Method functions
+
+    def __init__(self, nodeNames, sources, sinks):
+        """Class constructor
+        Parameters
+        ----------
+        nodeNames
+            Array of the node IPs, indexed by node id
+
+        sources
+            Integer array of the node id each edge leaves from
+
+        sinks
+            Integer array of the node id each edge points to
+
+        Returns
+        -------
+        None
+        """
+        self.nodeNames = nodeNames
+        self.numNodes = len(nodeNames)
+        sources = np.asarray(sources, dtype= np.int64)
+        sinks = np.asarray(sinks, dtype= np.int64)
+
+        _, firstOccurrences = np.unique(sources * self.numNodes + sinks, return_index= True)  # Repeated edges in the file count once
+        edges = np.sort(firstOccurrences)
+        edges = edges[np.argsort(sources[edges], kind= 'stable')]                               # Edge ids are grouped by origin, in file order
+        self.edgeSources = sources[edges]
+        self.edgeSinks = sinks[edges]
+        self.numEdges = len(edges)
+
+        self.outStarts = np.searchsorted(self.edgeSources, np.arange(self.numNodes + 1))
+        self.inEdges = np.argsort(self.edgeSinks, kind= 'stable')
+        self.inStarts = np.searchsorted(self.edgeSinks[self.inEdges], np.arange(self.numNodes + 1))
+        self.outDegrees = np.diff(self.outStarts)
+        self.edgeIds = dict(zip(zip(self.edgeSources.tolist(), self.edgeSinks.tolist()), range(self.numEdges)))
+
+        self.alive = np.ones(self.numEdges, dtype= bool)
+        self.liveOutDegrees = self.outDegrees.copy()
+
+    def reset(self):
+        """Brings every quarantined edge back for the next game"""
+        self.alive.fill(True)
+        self.liveOutDegrees[:] = self.outDegrees
+
+    def hasEdge(self, origin, destination):
+        """Returns true if there is a live edge from origin to destination"""
+        edge = self.edgeIds.get((origin, destination))
+        return edge is not None and bool(self.alive[edge])
+
+    def neighbors(self, node):
+        """Returns a numpy array of the nodes the node has live out going edges to"""
+        start, end = self.outStarts[node], self.outStarts[node + 1]
+        return self.edgeSinks[start:end][self.alive[start:end]]
+
+    def inNeighbors(self, node):
+        """Returns a numpy array of the nodes with live edges into the node"""
+        edges = self.inEdges[self.inStarts[node] : self.inStarts[node + 1]]
+        return self.edgeSources[edges[self.alive[edges]]]
+
+    def outDegree(self, node):
+        """Returns the number of live out going edges of the node"""
+        return int(self.liveOutDegrees[node])
+
+    def removeEdge(self, origin, destination):
+        """Quarantines one edge
+        Parameters
+        ----------
+        origin
+            Integer id of the node the edge leaves from
+
+        destination
+            Integer id of the node the edge points to
+
+        Returns
+        -------
+        removedEdges
+            List of the ids of the edges that were live and are now removed
+        """
+        edge = self.edgeIds.get((origin, destination))
+        if edge is None or not self.alive[edge]: return []
+        self.alive[edge] = False
+        self.liveOutDegrees[origin] -= 1
+        return [edge]
+
+    def removeOutEdges(self, origin):
+        """Quarantines every out going edge of a node
+        Parameters
+        ----------
+        origin
+            Integer id of the node being cut off
+
+        Returns
+        -------
+        removedEdges
+            List of the ids of the edges that were live and are now removed
+        """
+        start, end = self.outStarts[origin], self.outStarts[origin + 1]
+        removedEdges = (start + np.flatnonzero(self.alive[start:end])).tolist()
+        self.alive[start:end] = False
+        self.liveOutDegrees[origin] = 0
+        return removedEdges
+
+    def liveEdges(self):
+        """Returns the source and sink arrays of every live edge"""
+        return self.edgeSources[self.alive], self.edgeSinks[self.alive]
+
+    def toNetworkx(self):
+        """Builds a networkx DiGraph of the live network for statistics and drawing"""
+        import networkx
+        graph = networkx.DiGraph()
+        graph.add_nodes_from(range(self.numNodes))
+        sources, sinks = self.liveEdges()
+        graph.add_edges_from(zip(sources.tolist(), sinks.tolist()))
+        return graph
+
+if __name__ == "__main__":
+    graph = SimulationGraph(['a', 'b', 'c'], [0, 0, 1, 2, 0], [1, 2, 2, 0, 1])
+    print(graph.numEdges, graph.neighbors(0), graph.inNeighbors(2), graph.hasEdge(0, 2))
+    print(graph.removeEdge(0, 2), graph.hasEdge(0, 2), graph.neighbors(0), graph.inNeighbors(2))
+    print(graph.removeOutEdges(0), graph.outDegree(0), graph.liveEdges())
+    graph.reset()
+    print(graph.liveEdges(), graph.outDegree(0))
@@ -0,0 +1,106 @@
+# Python libraries
+import numpy as np
+
+class StratifiedReservoir():
+    """
+        Bounded uniform sample of a stream of rows, kept separately for every label.
+
+        The reservoirs share one budget of maxRows rows, split evenly over the labels seen so far. Each label
+        has its own reservoir, filled with reservoir sampling (Algorithm R) so every row of a label seen so far
+        is equally likely to be kept, however long the stream is. When a new label shows up the share of every
+        label shrinks and the larger reservoirs are cut down to a random subset, which is still a uniform sample.
+        Every label keeps at least one row, so at most max(maxRows, number of labels) rows are held. Rows arrive
+        in chunks and each chunk is placed with a handful of numpy calls per label. The number of rows seen of
+        each label is kept too, so a sample drawn from the reservoirs can be reweighted to the label mix of the
+        full stream.
+    """
+
+    ### Method functions
+
+    def __init__(self, maxRows):
+        """Class constructor
+        Parameters
+        ----------
+        maxRows
+            Integer number of rows kept at most across all labels, as long as there are no more labels than that
+
+        Returns
+        -------
+        None
+        """
+        self.maxRows = maxRows
+        self.reservoirs = {}                                  # Label to 2D numpy array of the rows kept for it
+        self.seen = {}                                        # Label to the number of its rows seen in the stream
+
+    def add(self, labels, rows):
+        """Offers one chunk of the stream to the reservoirs
+        Parameters
+        ----------
+        labels
+            numpy array with the label of each row
+
+        rows
+            2D numpy array of the rows, every chunk must have the same number of columns and type
+
+        Returns
+        -------
+        None
+        """
+        uniqueLabels, labelIndices = np.unique(labels, return_inverse= True)
+        numLabels = len(set(self.seen) | set(uniqueLabels.tolist()))
+        rowsPerLabel = max(1, self.maxRows // numLabels)
+        for label, reservoir in self.reservoirs.items():
+            if len(reservoir) > rowsPerLabel: self.reservoirs[label] = reservoir[np.random.choice(len(reservoir), rowsPerLabel, replace= False)]
+
+        for labelIndex, label in enumerate(uniqueLabels.tolist()):
+            labelRows = rows[labelIndices == labelIndex]
+            seen = self.seen.get(label, 0)
+            reservoir = self.reservoirs.get(label, rows[:0])
+            numFilled = max(0, min(len(labelRows), rowsPerLabel - len(reservoir)))
+            if numFilled > 0: reservoir = np.concatenate([reservoir, labelRows[:numFilled]])
+
+            # Row i of the label, counting from 0, replaces a random slot with probability rowsPerLabel / (i + 1)
+            positions = np.arange(seen + numFilled, seen + len(labelRows))
+            slots = (np.random.random(len(positions)) * (positions + 1)).astype(np.int64)
+            replacing = np.flatnonzero(slots < rowsPerLabel)
+            if len(replacing) > 0:
+                lastSlots, lastReplacing = np.unique(slots[replacing][::-1], return_index= True)   # A later row overwrites an earlier one in the same slot
+                reservoir[lastSlots] = labelRows[numFilled + replacing[::-1][lastReplacing]]
+
+            self.reservoirs[label] = reservoir
+            self.seen[label] = seen + len(labelRows)
+
+    def arrays(self):
+        """Returns the kept rows of every label stacked together
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        labels
+            List with the label of each kept row
+
+        rows
+            2D numpy array of the kept rows
+
+        weights
+            float64 numpy array of the number of stream rows each kept row stands for
+        """
+        labels = sorted(self.reservoirs)
+        rows = np.concatenate([self.reservoirs[label] for label in labels]) if labels else np.zeros((0, 0))
+        weights = np.concatenate([np.full(len(self.reservoirs[label]), self.seen[label] / len(self.reservoirs[label])) for label in labels]) if labels else np.zeros(0)
+        return [label for label in labels for _ in range(len(self.reservoirs[label]))], rows, weights
+
+if __name__ == "__main__":
+    np.random.seed(0)
+    counts = np.zeros(1000)
+    for trial in range(200):
+        reservoir = StratifiedReservoir(200)
+        for start in range(0, 1000, 64):
+            values = np.arange(start, min(start + 64, 1000))
+            reservoir.add(np.where(values < 900, 'a', 'b'), values.reshape(-1, 1))
+        labels, rows, weights = reservoir.arrays()
+        counts[rows[:, 0]] += 1
+    print(reservoir.seen, {label : len(rows) for label, rows in reservoir.reservoirs.items()}, np.unique(weights))
+    print('Keep rate of label a rows, early vs late:', counts[:450].mean() / 200, counts[450:900].mean() / 200)
@@ -0,0 +1,91 @@
+# Python libraries
+import numpy as np
+
+class SumTree():
+    """
+        Binary tree of priorities where every parent holds the sum of its children, stored flat in one array.
+
+        Leaf i sits at index leafStart + i and the children of node j at 2j and 2j + 1, with the root at 1.
+        Updating a priority rewrites the sums on its path to the root and drawing an item with probability
+        proportional to its priority walks down from the root, both in O(log n). Batches of updates and draws
+        move through the tree one level at a time so they run as numpy operations.
+    """
+
+    ### Method functions
+
+    def __init__(self, capacity):
+        """Class constructor
+        Parameters
+        ----------
+        capacity
+            Integer number of items with a priority
+
+        Returns
+        -------
+        None
+        """
+        self.capacity = capacity
+        self.leafStart = 1
+        while self.leafStart < capacity: self.leafStart *= 2              # Leaves are padded to a power of two, the padding keeps priority 0
+        self.tree = np.zeros(2 * self.leafStart, dtype= np.float64)
+        self.maxPriority = 1.0
+
+    def total(self):
+        """Returns the sum of every priority"""
+        return self.tree[1]
+
+    def update(self, indices, priorities):
+        """Sets the priority of a set of items
+        Parameters
+        ----------
+        indices
+            Integer array of item indices
+
+        priorities
+            Array of the new non negative priority of each item
+
+        Returns
+        -------
+        None
+        """
+        nodes = np.asarray(indices, dtype= np.int64) + self.leafStart
+        self.tree[nodes] = priorities
+        if len(nodes) > 0: self.maxPriority = max(self.maxPriority, float(np.max(priorities)))
+        nodes = np.unique(nodes // 2)
+        while len(nodes) > 0 and nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            nodes = np.unique(nodes // 2)
+
+    def get(self, indices):
+        """Returns the priority of a set of items"""
+        return self.tree[np.asarray(indices, dtype= np.int64) + self.leafStart]
+
+    def sample(self, numSamples):
+        """Draws items with probability proportional to their priority, one draw per equal slice of the total
+        Parameters
+        ----------
+        numSamples
+            Integer number of items drawn
+
+        Returns
+        -------
+        indices
+            Integer array of the drawn item indices, all with a priority above 0 as long as the total is above 0
+        """
+        bounds = np.linspace(0, self.total(), numSamples + 1)
+        values = bounds[:-1] + np.random.random(numSamples) * np.diff(bounds)
+        nodes = np.ones(numSamples, dtype= np.int64)
+        while numSamples > 0 and nodes[0] < self.leafStart:
+            leftChildren = 2 * nodes
+            goRight = (values >= self.tree[leftChildren]) & (self.tree[leftChildren + 1] > 0)   # Rounding past a sum never leads into an empty subtree
+            values = np.where(goRight, values - self.tree[leftChildren], values)
+            nodes = leftChildren + goRight
+        return nodes - self.leafStart                                    # Only items with a priority above 0 are drawn, never unfilled slots or padding
+
+if __name__ == "__main__":
+    tree = SumTree(5)
+    tree.update([0, 1, 2, 3, 4], [1, 0, 2, 0, 7])
+    print(tree.total(), tree.get([2, 4]))
+    print(np.bincount(tree.sample(10000), minlength= 5) / 10000)
+    tree.update([4], [0])
+    print(tree.total(), np.bincount(tree.sample(3000), minlength= 5) / 3000)
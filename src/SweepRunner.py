@@ -0,0 +1,241 @@
+# Python libraries
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import time
+import numpy as np
+
+# User defined libraries
+from Agent import Agent
+from GameEngine import GameEngine
+
+def runTrial(trial):
+    """Plays and trains one trial's episodes in a fresh worker process with the trial's constants set
+    Parameters
+    ----------
+    trial
+        Dictionary holding the trial id, its parameter values, the attack dataset path, the number of episodes and the seed
+
+    Returns
+    -------
+    result
+        The trial dictionary extended with the measured metrics, or with an error message if the trial failed
+    """
+    for variable in SweepRunner.THREAD_VARIABLES: os.environ[variable] = str(SweepRunner.THREADS_PER_TRIAL)
+    params = trial['params']
+    for name, owner in SweepRunner.SWEEPABLE_CONSTANTS.items():
+        if name in params: setattr(owner, name, params[name])
+    random.seed(trial['seed'])
+    np.random.seed(trial['seed'])
+
+    start = time.perf_counter()
+    try:
+        engine = GameEngine(trafficPath= params['trafficPath'], attackPath= trial['attackPath'], networkPath= params['networkPath'], visualize= False, replayCapacity= Agent.MAX_DATA_LENGTH)
+        attackerScores, defenderScores, rounds = [], [], []
+        for episode in range(trial['episodes']):
+            engine.initializeGame()
+            engine.runGame()
+            attackerScores.append(engine.attackerScore)
+            defenderScores.append(engine.defenderScore)
+            rounds.append(engine.roundNumber)
+            engine.attacker.train()                                         # Trained without checkpoints so trials never touch the stored models
+            engine.defender.train()
+    except Exception as error:
+        return dict(trial, error= '{0}: {1}'.format(type(error).__name__, error), seconds= time.perf_counter() - start)
+
+    evaluated = slice(-max(1, len(rounds) // SweepRunner.EVALUATED_FRACTION), None)  # Metrics are averaged over the last games, once the players had time to learn
+    return dict(trial, meanAttackerScore= float(np.mean(attackerScores[evaluated])), meanDefenderScore= float(np.mean(defenderScores[evaluated])),
+                meanRounds= float(np.mean(rounds[evaluated])), seconds= time.perf_counter() - start)
+
+class SweepRunner():
+    """
+        Runs a grid or random search over the training constants, the networks and the traffic datasets.
+
+        Every trial plays and trains a fresh pair of players in its own headless process, and the trials are
+        spread over a pool of worker processes. Each finished trial is appended as one JSON line to the
+        results file, keyed by a hash of its settings, and trials already in the file are skipped, so an
+        interrupted sweep resumes where it stopped. Failed trials are recorded with their error and retried
+        on the next run.
+    """
+
+    ### Static Class Variables
+    SWEEPABLE_CONSTANTS = {'DEFAULT_LEARNING_RATE' : Agent, 'DEFAULT_EPSILON_DECAY' : Agent, 'MAX_DATA_LENGTH' : Agent,
+                           'MAX_BACKGROUND_TRAFFIC_MESSAGES' : GameEngine}   # Class constants a trial can set, mapped to the class holding them
+    UNSWEEPABLE_CONSTANTS = {'DEFAULT_DISCOUNT_RATE' : 'the players train on immediate rewards only, so the discount rate has no effect on a trial'}
+    DEFAULT_NETWORKS = ['../networks/sf_20.csv']
+    DEFAULT_DATASETS = ['../datasets/defaultTrafficDataset.csv']
+    DEFAULT_ATTACK_PATH = '../datasets/defaultAttackDataset.csv'
+    DEFAULT_RESULTS_PATH = '../local_logs/SWEEP.jsonl'
+    DEFAULT_EPISODES = 20
+    EVALUATED_FRACTION = 4                                    # Metrics are averaged over the last quarter of each trial's games
+    THREADS_PER_TRIAL = 1                                     # Tensorflow threads per trial, the pool already keeps every core busy
+    THREAD_VARIABLES = ['TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS', 'OMP_NUM_THREADS']
+
+    ### Method functions
+
+    def __init__(self, space, networkPaths, datasetPaths, attackPath= DEFAULT_ATTACK_PATH, episodes= DEFAULT_EPISODES, seed= 0, numWorkers= None, resultsPath= DEFAULT_RESULTS_PATH):
+        """Class constructor
+        Parameters
+        ----------
+        space
+            Dictionary mapping each swept constant in SWEEPABLE_CONSTANTS to the list of values tried for it
+
+        networkPaths
+            List of string file paths to the networks every setting is tried on
+
+        datasetPaths
+            List of string file paths to the background traffic datasets every setting is tried with
+
+        attackPath
+            String file path to the dataset used for attack messages
+
+        episodes
+            Integer number of games played and trained on per trial
+
+        seed
+            Integer seed every trial starts from so trials are comparable
+
+        numWorkers
+            Integer number of trials run at once, every core is used if None
+
+        resultsPath
+            String path of the JSON lines file results are appended to and resumed from
+
+        Returns
+        -------
+        None
+        """
+        for name in sorted(set(space) & set(SweepRunner.UNSWEEPABLE_CONSTANTS)):
+            raise ValueError('{0} can not be swept, {1}'.format(name, SweepRunner.UNSWEEPABLE_CONSTANTS[name]))
+        unknown = set(space) - set(SweepRunner.SWEEPABLE_CONSTANTS)
+        if unknown: raise ValueError('Unknown sweep parameters: ' + ', '.join(sorted(unknown)))
+        self.space = dict(space, networkPath= networkPaths, trafficPath= datasetPaths)
+        self.names = sorted(self.space)
+        self.attackPath = attackPath
+        self.episodes = episodes
+        self.seed = seed
+        self.numWorkers = numWorkers if numWorkers is not None else multiprocessing.cpu_count()
+        self.resultsPath = resultsPath
+
+    def numSettings(self):
+        """Returns the number of settings in the full grid"""
+        return int(np.prod([len(self.space[name]) for name in self.names]))
+
+    def getSetting(self, index):
+        """Returns the parameter values of one grid setting, numbering the grid with the last parameter changing fastest"""
+        params = {}
+        for name in reversed(self.names):
+            index, valueIndex = divmod(index, len(self.space[name]))
+            params[name] = self.space[name][valueIndex]
+        return params
+
+    def getTrials(self, randomTrials= None):
+        """Lists the trials of the sweep
+        Parameters
+        ----------
+        randomTrials
+            Integer number of distinct settings drawn at random from the grid, the whole grid is swept if None
+
+        Returns
+        -------
+        trials
+            List of trial dictionaries, each with an id that only depends on its settings
+        """
+        indices = range(self.numSettings())
+        if randomTrials is not None and randomTrials < len(indices): indices = sorted(random.Random(self.seed).sample(indices, randomTrials))
+        trials = []
+        for index in indices:
+            trial = {'params' : self.getSetting(index), 'attackPath' : self.attackPath, 'episodes' : self.episodes, 'seed' : self.seed}
+            trial['trialId'] = hashlib.sha1(json.dumps(trial, sort_keys= True).encode()).hexdigest()[:16]
+            trials.append(trial)
+        return trials
+
+    def loadFinished(self):
+        """Returns the set of ids of the trials that finished without error in the results file, skipping any line cut off by a crash"""
+        finished = set()
+        if not os.path.exists(self.resultsPath): return finished
+        with open(self.resultsPath) as file:
+            for line in file:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue
+                if 'error' not in result: finished.add(result['trialId'])
+        return finished
+
+    def run(self, randomTrials= None):
+        """Runs every trial not already in the results file, appending each result as soon as it finishes
+        Parameters
+        ----------
+        randomTrials
+            Integer number of settings drawn at random from the grid, the whole grid is swept if None
+
+        Returns
+        -------
+        results
+            List of the result dictionaries of the trials run now, in the order they finished
+        """
+        finished = self.loadFinished()
+        trials = [trial for trial in self.getTrials(randomTrials) if trial['trialId'] not in finished]
+        print(len(trials), 'trials to run,', len(finished), 'already finished')
+        if not trials: return []
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.resultsPath)), exist_ok= True)
+        self.endPartialLine()
+        context = multiprocessing.get_context('spawn')               # Every trial gets a fresh process so its constants never leak into the next one
+        results = []
+        with context.Pool(min(self.numWorkers, len(trials)), maxtasksperchild= 1) as pool, open(self.resultsPath, 'a') as file:
+            for result in pool.imap_unordered(runTrial, trials):
+                file.write(json.dumps(result, sort_keys= True) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+                results.append(result)
+                print('{0}/{1}'.format(len(results), len(trials)), SweepRunner.formatResult(result))
+        return results
+
+    def endPartialLine(self):
+        """Ends a line cut off by a crash, so the next result does not get appended to it"""
+        if not os.path.exists(self.resultsPath) or os.path.getsize(self.resultsPath) == 0: return
+        with open(self.resultsPath, 'rb+') as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b'\n': file.write(b'\n')
+
+    @staticmethod
+    def formatResult(result):
+        """Returns a one line summary of a trial result"""
+        if 'error' in result: return '{0} failed: {1}'.format(result['params'], result['error'])
+        return '{params}: attacker {meanAttackerScore:.2f}, defender {meanDefenderScore:.2f}, {meanRounds:.1f} rounds, {seconds:.1f} s'.format(**result)
+
+def parseValue(value):
+    """Reads a command line value as an int or float when it is one, and as a string otherwise"""
+    for valueType in (int, float):
+        try:
+            return valueType(value)
+        except ValueError:
+            pass
+    return value
+
+if __name__ == "__main__":
+    """Runs a resumable hyperparameter sweep across every core"""
+    parser = argparse.ArgumentParser(description= 'Sweeps training constants, networks and datasets in parallel headless trials.')
+    parser.add_argument('-p', '--param', action= 'append', default= [], help= 'Swept constant and its values as NAME=v1,v2,..., one of ' + ', '.join(SweepRunner.SWEEPABLE_CONSTANTS))
+    parser.add_argument('-n', '--networks', nargs= '+', default= SweepRunner.DEFAULT_NETWORKS, help= 'Paths to the networks every setting is tried on')
+    parser.add_argument('-d', '--datasets', nargs= '+', default= SweepRunner.DEFAULT_DATASETS, help= 'Paths to the background traffic datasets every setting is tried with')
+    parser.add_argument('-ap', '--attackPath', type= str, default= SweepRunner.DEFAULT_ATTACK_PATH, help= 'Path to the file of attack messages')
+    parser.add_argument('-ep', '--episodes', type= int, default= SweepRunner.DEFAULT_EPISODES, help= 'Number of games played and trained on per trial')
+    parser.add_argument('-r', '--randomTrials', type= int, default= None, help= 'Number of settings drawn at random from the grid, the whole grid is run if not set')
+    parser.add_argument('-w', '--workers', type= int, default= None, help= 'Number of trials run at once, defaults to the number of cores')
+    parser.add_argument('-s', '--seed', type= int, default= 0, help= 'Seed every trial starts from, also picks the random trials')
+    parser.add_argument('-o', '--output', type= str, default= SweepRunner.DEFAULT_RESULTS_PATH, help= 'JSON lines file results are appended to, trials already in it are skipped')
+    args = parser.parse_args()
+
+    space = {}
+    for param in args.param:
+        name, values = param.split('=', 1)
+        space[name.strip()] = [parseValue(value.strip()) for value in values.split(',')]
+
+    sweep = SweepRunner(space, args.networks, args.datasets, attackPath= args.attackPath, episodes= args.episodes, seed= args.seed, numWorkers= args.workers, resultsPath= args.output)
+    sweep.run(randomTrials= args.randomTrials)
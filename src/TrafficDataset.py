@@ -0,0 +1,182 @@
+# Python libraries
+import os
+import numpy as np
+
+# User defined libraries
+from Message import Message, MessageBatch
+from StratifiedReservoir import StratifiedReservoir
+
+class TrafficDataset():
+    """
+        Message metadata from a capture file, parsed once per process and pre-encoded into numpy columns.
+
+        Only the columns a Message actually uses are kept: the network input features in the same order
+        asNetworkInputs returns them, and the truth label as a boolean. Loaded datasets are cached by path so
+        every later game reuses the already encoded arrays instead of re-reading the csv.
+
+        Captures too large to hold in memory are streamed instead: the file is read in chunks of only the
+        used columns and a reservoir of rows is kept per label, all sharing one row budget, see StratifiedReservoir. Each kept row
+        is drawn in proportion to the number of rows of its label in the whole file, so the label mix of the
+        traffic matches the capture while memory stays fixed.
+    """
+
+    ### Static Class Variables
+    loadedDatasets = {}                                       # Cache of every dataset loaded by this process, keyed by file path and reservoir size
+    STREAMING_THRESHOLD_BYTES = 256 * 1024 ** 2               # Files larger than this are streamed into reservoirs unless a reservoir size is given
+    DEFAULT_RESERVOIR_SIZE = 1000000                          # Rows kept across all labels when a large file is streamed, about 16 MB of features
+    STREAMING_CHUNK_ROWS = 1000000                            # Rows parsed per chunk while streaming
+
+    ### Class functions
+
+    @classmethod
+    def load(cls, datasetPath, reservoirSize= None):
+        """Returns the encoded dataset for a file, only parsing the csv the first time it is requested
+        Parameters
+        ----------
+        datasetPath
+            String representing the file path to the message dataset
+
+        reservoirSize
+            Integer number of rows kept across all labels when streaming the file, if None the file is only streamed,
+            with DEFAULT_RESERVOIR_SIZE rows, when it is larger than STREAMING_THRESHOLD_BYTES
+
+        Returns
+        -------
+        dataset
+            TrafficDataset holding the encoded columns of the file
+        """
+        if reservoirSize is None and os.path.getsize(datasetPath) > cls.STREAMING_THRESHOLD_BYTES: reservoirSize = cls.DEFAULT_RESERVOIR_SIZE
+        key = (datasetPath, reservoirSize)
+        if key not in cls.loadedDatasets:
+            if reservoirSize is None:
+                import pandas as pd
+                cls.loadedDatasets[key] = cls.fromFrame(pd.read_csv(datasetPath))
+            else:
+                cls.loadedDatasets[key] = cls.stream(datasetPath, reservoirSize)
+        return cls.loadedDatasets[key]
+
+    @classmethod
+    def fromFrame(cls, frame):
+        """Encodes a pandas DataFrame with the message metadata columns laid out as described by the Message index variables"""
+        labels = frame.iloc[:, Message.LABEL_INDEX].astype(str).str.strip()
+        return cls(frame.iloc[:, Message.NETWORK_INPUT_INDICES].values.astype(np.float32), (labels == Message.MALICIOUS_LABEL).values)
+
+    @classmethod
+    def stream(cls, datasetPath, reservoirSize, chunkRows= STREAMING_CHUNK_ROWS):
+        """Reads a capture file in chunks, keeping a bounded uniform sample of the rows of every label
+        Parameters
+        ----------
+        datasetPath
+            String representing the file path to the message dataset
+
+        reservoirSize
+            Integer number of rows kept at most, split evenly over the distinct labels of the file with at least one row each
+
+        chunkRows
+            Integer number of rows parsed at a time
+
+        Returns
+        -------
+        dataset
+            TrafficDataset of the kept rows, drawn in proportion to how many rows of their label the file holds
+        """
+        import pandas as pd
+        columns = Message.NETWORK_INPUT_INDICES + [Message.LABEL_INDEX]
+        reservoir = StratifiedReservoir(reservoirSize)
+        for chunk in pd.read_csv(datasetPath, usecols= columns, chunksize= chunkRows):
+            chunk = chunk.iloc[:, np.argsort(np.argsort(columns))]         # usecols keeps the file's column order, put it back in the order of columns
+            labels = chunk.iloc[:, -1].astype(str).str.strip().values
+            reservoir.add(labels, chunk.iloc[:, :-1].values.astype(np.float32))
+        labels, features, weights = reservoir.arrays()
+        return cls(features.reshape(-1, len(Message.NETWORK_INPUT_INDICES)), np.array(labels) == Message.MALICIOUS_LABEL, cumulativeWeights= np.cumsum(weights))
+
+    ### Method functions
+
+    def __init__(self, features, malicious, cumulativeWeights= None):
+        """Class constructor
+        Parameters
+        ----------
+        features
+            2D float32 numpy array of the network input features of each message, in the order asNetworkInputs returns them
+
+        malicious
+            numpy boolean array flagging the malicious messages
+
+        cumulativeWeights
+            numpy array of the running sum of how likely each row is to be drawn relative to the others, rows are drawn uniformly if None
+
+        Returns
+        -------
+        None
+        """
+        self.features = features
+        self.dur, self.srcbytes, self.totbytes, self.totpkts = self.features.T
+        self.malicious = malicious
+        self.cumulativeWeights = cumulativeWeights
+
+    def __len__(self):
+        """Returns the number of messages in the dataset"""
+        return len(self.malicious)
+
+    def sampleRows(self, numRows):
+        """Draws random row indices from the dataset with replacement
+        Parameters
+        ----------
+        numRows
+            Integer number of rows to draw
+
+        Returns
+        -------
+        rowIndices
+            numpy array of integer row indices
+        """
+        if self.cumulativeWeights is None: return np.random.randint(0, len(self), size= numRows)
+        return np.searchsorted(self.cumulativeWeights, np.random.random(numRows) * self.cumulativeWeights[-1], side= 'right')
+
+    def buildBatch(self, rowIndices, origins, destinations):
+        """Builds a batch of messages from rows of the dataset, rerouted between nodes of the current network
+        Parameters
+        ----------
+        rowIndices
+            Array of the integer indices of the rows holding each message's metadata
+
+        origins
+            Array of the node ids sending each message
+
+        destinations
+            Array of the node ids receiving each message
+
+        Returns
+        -------
+        batch
+            MessageBatch containing the metadata of the rows
+        """
+        return MessageBatch(origins, destinations, self.features[rowIndices], self.malicious[rowIndices])
+
+    def buildMessage(self, rowIndex, origin, destination):
+        """Builds a single message from one row of the dataset, rerouted between two nodes of the current network
+        Parameters
+        ----------
+        rowIndex
+            Integer index of the row holding the message metadata
+
+        origin
+            Node id of the sender of the message
+
+        destination
+            Node id of the receipent of the message
+
+        Returns
+        -------
+        message
+            Message view over a one row batch containing the metadata of the row
+        """
+        return self.buildBatch([rowIndex], [origin], [destination])[0]
+
+if __name__ == "__main__":
+    dataset = TrafficDataset.load("../datasets/defaultTrafficDataset.csv")
+    print(len(dataset), dataset.features[:3], dataset.malicious[:3])
+    print(TrafficDataset.load("../datasets/defaultTrafficDataset.csv") is dataset)
+    print(dataset.buildMessage(dataset.sampleRows(1)[0], 0, 1))
+    streamed = TrafficDataset.stream("../datasets/defaultAttackDataset.csv", reservoirSize= 10, chunkRows= 7)
+    print(len(streamed), streamed.malicious.sum(), streamed.malicious[streamed.sampleRows(1000)].mean())
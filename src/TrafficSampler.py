@@ -0,0 +1,121 @@
+# Python libraries
+import numpy as np
+
+class TrafficSampler():
+    """
+        Draws origin and destination pairs for background traffic along the live edges of the network.
+
+        Every node's out going neighbors are stored in one flat array, with the live ones packed at the front
+        of that node's slot range. Removing an edge swaps it behind the live range, so picking a random live
+        destination is a single index lookup and a whole round of messages can be drawn in one vectorized call.
+        The nodes that still have live out going edges are kept in their own packed array for the same reason.
+    """
+
+    ### Method functions
+
+    def __init__(self, graph, liveOriginsOnly= True):
+        """Class constructor
+        Parameters
+        ----------
+        graph
+            SimulationGraph of the network, the sampler keeps its own copy of the edge layout
+
+        liveOriginsOnly
+            Boolean, if set messages are only sent from nodes with live out going edges,
+            otherwise origins are drawn from every node and messages from isolated nodes are dropped
+
+        Returns
+        -------
+        None
+        """
+        self.graph = graph
+        self.numNodes = graph.numNodes
+        self.liveOriginsOnly = liveOriginsOnly
+        self.starts = graph.outStarts[:-1]                                # Edges of each origin start out in the graph's own row order
+        self.targets = graph.edgeSinks.copy()
+        self.edgeSlots = np.arange(graph.numEdges)                        # Slot in targets of each edge id
+        self.slotEdges = np.arange(graph.numEdges)                        # Edge id held in each slot of targets
+        self.liveDegrees = graph.outDegrees.copy()
+        self.liveOrigins = np.flatnonzero(graph.outDegrees > 0)
+        self.originSlots = np.full(self.numNodes, -1, dtype= np.int64)    # Position of each node in liveOrigins, -1 once it has no live edges
+        self.reset()
+
+    def reset(self):
+        """Brings every removed edge back into the sampler for the next game"""
+        self.targets[:] = self.graph.edgeSinks
+        self.edgeSlots[:] = np.arange(self.graph.numEdges)
+        self.slotEdges[:] = self.edgeSlots
+        self.liveDegrees[:] = self.graph.outDegrees
+        self.liveOrigins = np.flatnonzero(self.graph.outDegrees > 0)
+        self.numLiveOrigins = len(self.liveOrigins)
+        self.originSlots.fill(-1)
+        self.originSlots[self.liveOrigins] = np.arange(self.numLiveOrigins)
+
+    def removeEdge(self, edge):
+        """Takes an edge out of the sampler after it was removed from the network
+        Parameters
+        ----------
+        edge
+            Integer id of the removed edge in the SimulationGraph
+
+        Returns
+        -------
+        None
+        """
+        origin = self.graph.edgeSources[edge]
+        slot = self.edgeSlots[edge]
+        lastSlot = self.starts[origin] + self.liveDegrees[origin] - 1
+        if slot > lastSlot: return                                        # Already behind the live range
+        movedEdge = self.slotEdges[lastSlot]
+        self.targets[slot], self.targets[lastSlot] = self.targets[lastSlot], self.targets[slot]
+        self.slotEdges[slot], self.slotEdges[lastSlot] = movedEdge, edge
+        self.edgeSlots[movedEdge], self.edgeSlots[edge] = slot, lastSlot
+        self.liveDegrees[origin] -= 1
+        if self.liveDegrees[origin] == 0: self.removeOrigin(origin)
+
+    def removeOrigin(self, origin):
+        """Swaps a node that lost its last live edge out of the packed array of live origins"""
+        position = self.originSlots[origin]
+        lastPosition = self.numLiveOrigins - 1
+        movedOrigin = int(self.liveOrigins[lastPosition])
+        self.liveOrigins[position] = movedOrigin
+        self.liveOrigins[lastPosition] = origin
+        self.originSlots[movedOrigin] = position
+        self.originSlots[origin] = -1
+        self.numLiveOrigins -= 1
+
+    def sample(self, numMessages):
+        """Draws the origin and destination of a batch of messages in one vectorized pass
+        Parameters
+        ----------
+        numMessages
+            Integer number of messages to draw
+
+        Returns
+        -------
+        origins
+            numpy array of the node ids sending each message
+
+        destinations
+            numpy array of the node ids receiving each message, each one a live out going neighbor of its origin
+        """
+        if self.liveOriginsOnly:
+            if self.numLiveOrigins == 0: return np.zeros(0, dtype= np.int64), np.zeros(0, dtype= np.int64)
+            origins = self.liveOrigins[np.random.randint(0, self.numLiveOrigins, size= numMessages)]
+        else:
+            origins = np.random.randint(0, self.numNodes, size= numMessages)
+            origins = origins[self.liveDegrees[origins] > 0]
+        offsets = (np.random.random(len(origins)) * self.liveDegrees[origins]).astype(np.int64)
+        destinations = self.targets[self.starts[origins] + offsets]
+        return origins, destinations
+
+if __name__ == "__main__":
+    from SimulationGraph import SimulationGraph
+    graph = SimulationGraph(['a', 'b', 'c', 'd', 'e'], [0, 0, 1, 2], [1, 2, 2, 3])
+    sampler = TrafficSampler(graph)
+    print(sampler.sample(8))
+    sampler.removeEdge(graph.removeEdge(0, 1)[0])
+    sampler.removeEdge(graph.removeEdge(2, 3)[0])
+    print(sampler.sample(8), sampler.liveOrigins[:sampler.numLiveOrigins])
+    sampler.reset()
+    print(sampler.sample(8), sampler.liveOrigins[:sampler.numLiveOrigins])
@@ -0,0 +1,129 @@
+# Python libraries
+import time
+import numpy as np
+
+# User defined libraries
+from GameEngine import GameEngine
+
+class VecGameEngine():
+    """
+        Steps several games on the same network in lockstep so the players decide for all of them at once.
+
+        Every round the attacker picks the attacks of every running game in one batched model call, then the
+        defender labels the inspected messages of every game in one more. The results are handed back to each
+        game, which plays out its own queues in order exactly like a single GameEngine round. All games share
+        the players of the main engine, so their memories pool together for training. Lockstepped games are
+        never drawn, so the main engine is made headless too when it has company.
+    """
+
+    ### Method functions
+
+    def __init__(self, engine, numEnvironments):
+        """Class constructor
+        Parameters
+        ----------
+        engine
+            GameEngine of the main process, plays as the first game and provides the shared players, its visualization is turned off if numEnvironments is above 1
+
+        numEnvironments
+            Integer number of games stepped together
+
+        Returns
+        -------
+        None
+        """
+        self.engine = engine
+        if numEnvironments > 1: engine.visualizeGame = False                  # Rounds are stepped across all games at once, so none of them draws or prints its messages
+        self.attacker = engine.attacker
+        self.defender = engine.defender
+        self.environments = [engine] + [GameEngine(trafficPath= engine.trafficPath, attackPath= engine.attackPath, networkPath= engine.networkPath, visualize= False, recordPath= engine.recordPath, reservoirSize= engine.reservoirSize,
+                                                   attacker= self.attacker, defender= self.defender) for _ in range(numEnvironments - 1)]
+
+    def initializeGames(self, environments):
+        """Resets the given games and the shared players for the next set of games"""
+        self.attacker.prepareForNextGame()
+        self.defender.prepareForNextGame()
+        for environment in environments:
+            environment.initializeGame(resetPlayers= False)
+
+    def runGames(self, environments):
+        """Runs one game in each of the given environments, stepping the games still running one round at a time
+        Parameters
+        ----------
+        environments
+            List of GameEngines with freshly initialized games
+
+        Returns
+        -------
+        None
+        """
+        gamesStart = time.perf_counter()
+        for environment in environments: environment.playSeconds = 0.0
+        runningGames = [environment for environment in environments if not environment.gameOver()]
+        while runningGames:
+            self.playRound(runningGames)
+            for environment in runningGames: environment.playSeconds = time.perf_counter() - gamesStart  # Wall time until each game finished
+            runningGames = [environment for environment in runningGames if not environment.gameOver()]
+
+    def playRound(self, environments):
+        """Plays one round in each of the given games with one batched decision per player
+        Parameters
+        ----------
+        environments
+            List of GameEngines whose games are still running
+
+        Returns
+        -------
+        None
+        """
+        observations = []
+        for environment in environments:
+            environment.roundNumber += 1
+            environment.lastAttackerScore = 0
+            observations.append(environment.observeNetwork())
+        attackIndices = self.attacker.chooseAttacks(observations)
+
+        rounds = []
+        for environment, observation, attackIndex in zip(environments, observations, attackIndices):
+            attackMessage = self.attacker.buildAttackMessage(attackIndex, environment.frontier)
+            traffic, queueOrder, trafficInfo, attackIndex = environment.queueTraffic(observation, attackMessage, attackIndex)
+            skippedInspections = environment.scheduleInspections(traffic, queueOrder)
+            rounds.append([traffic, queueOrder, skippedInspections, trafficInfo, attackIndex])
+
+        inspectedFeatures = [traffic.features[queueOrder[~skippedInspections]] for traffic, queueOrder, skippedInspections, _, _ in rounds]
+        inspectedLabels = self.defender.inspectBatch(np.concatenate(inspectedFeatures))
+        firstLabel = 0
+        for environment, (traffic, queueOrder, skippedInspections, trafficInfo, attackIndex), features in zip(environments, rounds, inspectedFeatures):
+            suspicionLabels = environment.labelTraffic(skippedInspections, inspectedLabels[firstLabel : firstLabel + len(features)])
+            firstLabel += len(features)
+            environment.playTraffic(traffic, queueOrder, suspicionLabels, skippedInspections, trafficInfo, attackIndex)
+
+    def run(self, episodes, train= False):
+        """Plays the episodes in sets of numEnvironments lockstepped games
+        Parameters
+        ----------
+        episodes
+            Integer number of games to be played
+
+        train
+            Boolean, if set the shared players train on the pooled memory of each finished set of games
+
+        Returns
+        -------
+        None
+        """
+        for firstEpisode in range(0, episodes, len(self.environments)):
+            environments = self.environments[:episodes - firstEpisode]
+            self.initializeGames(environments)
+            self.runGames(environments)
+            for episode in range(firstEpisode, firstEpisode + len(environments)):
+                print('Episode', episode, 'complete')
+            gameResults = [environment.getGameResults() for environment in environments]
+            if train:
+                self.engine.train()
+                print('Training for episodes', firstEpisode, 'to', firstEpisode + len(environments) - 1, 'complete')
+            for episode, results in enumerate(gameResults, firstEpisode):
+                self.engine.logGameResults(results, episode)                # Every game goes through the main engine's log, the set's training time lands on its first row
+            for episode, environment in enumerate(environments, firstEpisode):
+                environment.saveRecording(episode)
+            self.engine.logPhaseTimes(firstEpisode)